@@ -35,6 +35,13 @@ def create_app(config_class=Config):
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
     
+    from .services.checkpoint import checkpoint_store
+    checkpoint_store.cleanup(app.config['CHECKPOINT_MAX_AGE_HOURS'])
+    
+    if app.config['LIGHTON_PRELOAD']:
+        from .services.lighton_server import lighton_server
+        lighton_server.preload()
+    
     from .routes.views import views_bp
     from .routes.api import api_bp
     
@@ -27,8 +27,36 @@ class Config:
     
     OCR_ENABLED = False
     OCR_DEFAULT_LANG = 'en'
+    OCR_CACHE_FOLDER = BASE_DIR / 'cache' / 'ocr'
+    OCR_CACHE_MAX_MB = int(os.environ.get('OCR_CACHE_MAX_MB', 512))
+    OCR_PAGE_MAX_TOKENS = int(os.environ.get('OCR_PAGE_MAX_TOKENS', 4096))
+    OCR_PAGE_MAX_SECONDS = float(os.environ.get('OCR_PAGE_MAX_SECONDS', 300))
+    
+    LIGHTON_PRELOAD = os.environ.get('LIGHTON_PRELOAD', '').lower() in ('1', 'true', 'yes')
+    LIGHTON_MAX_BATCH_SIZE = int(os.environ.get('LIGHTON_MAX_BATCH_SIZE', 4))
+    LIGHTON_MAX_WAIT_MS = int(os.environ.get('LIGHTON_MAX_WAIT_MS', 50))
+    LIGHTON_CPU_QUANTIZE = os.environ.get('LIGHTON_CPU_QUANTIZE', '').lower() in ('1', 'true', 'yes')
+    LIGHTON_CPU_THREADS = int(os.environ.get('LIGHTON_CPU_THREADS', 0)) or None
+    LIGHTON_CPU_INTEROP_THREADS = int(os.environ.get('LIGHTON_CPU_INTEROP_THREADS', 1))
+    
+    LLM_POOL_SIZE = int(os.environ.get('LLM_POOL_SIZE', 8))
+    LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', 4))
+    LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', 3))
+    LLM_CONNECT_TIMEOUT = float(os.environ.get('LLM_CONNECT_TIMEOUT', 5))
+    LLM_READ_TIMEOUT = float(os.environ.get('LLM_READ_TIMEOUT', 1800))
+    LLM_BREAKER_THRESHOLD = int(os.environ.get('LLM_BREAKER_THRESHOLD', 5))
+    LLM_BREAKER_RESET_SECONDS = float(os.environ.get('LLM_BREAKER_RESET_SECONDS', 30))
+    LLM_CHUNK_CHARS = int(os.environ.get('LLM_CHUNK_CHARS', 6000))
+    LLM_CHUNK_OVERLAP_CHARS = int(os.environ.get('LLM_CHUNK_OVERLAP_CHARS', 300))
+    LLM_CHUNK_CONCURRENCY = int(os.environ.get('LLM_CHUNK_CONCURRENCY', 4))
+    LLM_CACHE_FOLDER = BASE_DIR / 'cache' / 'llm'
+    LLM_CACHE_MAX_MB = int(os.environ.get('LLM_CACHE_MAX_MB', 256))
+    LLM_DETERMINISTIC = os.environ.get('LLM_DETERMINISTIC', '').lower() in ('1', 'true', 'yes')
     
     CLEANUP_AFTER_HOURS = 1
+    
+    CHECKPOINT_FOLDER = BASE_DIR / 'checkpoints'
+    CHECKPOINT_MAX_AGE_HOURS = int(os.environ.get('CHECKPOINT_MAX_AGE_HOURS', 24))
 
 
 class DevelopmentConfig(Config):
@@ -1,4 +1,6 @@
+import io
 import os
+import time
 import threading
 from flask import Blueprint, request, jsonify, send_file, current_app, Response, stream_with_context
 from werkzeug.exceptions import RequestEntityTooLarge
@@ -26,12 +28,19 @@ from ..services import (
     AudioCompressor,
     ImageCompressor
 )
-from .websocket import emit_progress, emit_complete, emit_error
+from ..services.pdf_assembler import PDFAssembler
+from ..services.pdf_raster import zip_output_path
+from ..services.checkpoint import checkpoint_store
+from .websocket import emit_progress, emit_partial, emit_tokens, emit_complete, emit_error
 from ..services.stats import stats_service as stats
 
 api_bp = Blueprint('api', __name__)
 conversion_jobs = {}
 
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_POLL_SECONDS = 0.2
+RESUMABLE_TEXT_FORMATS = {'txt', 'md', 'html'}
+
 
 def api_response(data=None, error=None, success=True):
     return jsonify({'success': success, 'data': data, 'error': error})
@@ -225,7 +234,7 @@ def get_output_formats_for_type(file_type: str) -> list:
     elif file_type == 'image':
         return sorted(['png', 'jpg', 'jpeg', 'webp', 'ico', 'ocr-pdf', 'ocr-docx', 'ocr-txt', 'ocr-md', 'ocr-html'])
     elif file_type == 'document':
-        return sorted(['docx', 'html', 'md', 'ocr-docx', 'ocr-html', 'ocr-md', 'ocr-pdf', 'ocr-txt', 'pdf', 'txt'])
+        return sorted(['docx', 'html', 'jpg', 'md', 'ocr-docx', 'ocr-html', 'ocr-md', 'ocr-pdf', 'ocr-txt', 'pdf', 'png', 'txt', 'webp'])
     return []
 
 
@@ -260,21 +269,43 @@ def start_conversion():
     if output_format.lower() not in [f.lower() for f in job['output_formats']]:
         return api_response(error={'type': 'UnsupportedFormatError', 'message': f'Format {output_format} not available'}, success=False), 400
     
+    job_id = generate_file_id()
+    
+    checkpoint = None
+    if is_resumable(job, output_format, options):
+        try:
+            checkpoint = checkpoint_store.create(job_id, job, output_format, options)
+        except Exception:
+            checkpoint = None
+    
+    launch_conversion(job, job_id, output_format, options, checkpoint)
+    
+    return api_response(data={'job_id': job_id, 'status': 'converting'})
+
+
+def is_resumable(job, output_format, options):
+    if output_format.lower().startswith('ocr-') or options.get('force_ocr'):
+        return True
+    return (
+        job['file_type'] == 'document' and
+        job['input_path'].lower().endswith('.pdf') and
+        output_format.lower() in RESUMABLE_TEXT_FORMATS
+    )
+
+
+def launch_conversion(job, job_id, output_format, options, checkpoint=None):
     output_folder = current_app.config['OUTPUT_FOLDER']
     
     target_extension = output_format
     if output_format.lower().startswith('ocr-'):
         target_extension = output_format[4:]
-        
-    output_path = get_output_path(output_folder, job['original_filename'], target_extension)
-    
-    job_id = generate_file_id()
     
     job['status'] = 'converting'
     job['job_id'] = job_id
     job['output_format'] = output_format
-    job['output_path'] = output_path
+    job['output_path'] = get_output_path(output_folder, job['original_filename'], target_extension)
     job['progress'] = 0
+    job['partial_pages'] = 0
     
     conversion_jobs[job_id] = job
     
@@ -282,13 +313,76 @@ def start_conversion():
         job['progress'] = progress
         emit_progress(job_id, progress)
     
-    thread = threading.Thread(target=run_conversion, args=(job, output_format, options, progress_callback))
-    thread.start()
+    def page_callback(page, content):
+        job['partial_pages'] += 1
+        emit_partial(job_id, page, content)
     
-    return api_response(data={'job_id': job_id, 'status': 'converting'})
+    def token_callback(page, content):
+        emit_tokens(job_id, page, content)
+    
+    thread = threading.Thread(
+        target=run_conversion,
+        args=(job, output_format, dict(options), progress_callback, page_callback, checkpoint, token_callback)
+    )
+    thread.start()
+
+
+@api_bp.route('/resume/<job_id>', methods=['POST'])
+def resume_conversion(job_id):
+    if job_id in conversion_jobs and conversion_jobs[job_id]['status'] == 'converting':
+        return api_response(error={'type': 'JobRunningError', 'message': 'Job is still running'}, success=False), 409
+    
+    checkpoint = checkpoint_store.load(job_id)
+    if checkpoint is None:
+        return api_response(error={'type': 'NotFoundError', 'message': 'No checkpoint for this job'}, success=False), 404
+    
+    record = checkpoint.record
+    options = dict(record['options'])
+    if record.get('requires_password'):
+        password = (request.get_json(silent=True) or {}).get('password')
+        if not password:
+            return api_response(error={'type': 'PasswordRequiredError', 'message': 'Password required to resume this job'}, success=False), 401
+        options['password'] = password
+    
+    job = {
+        'input_path': checkpoint.input_path,
+        'original_filename': record['original_filename'],
+        'file_type': record['file_type'],
+        'output_formats': get_output_formats_for_type(record['file_type'])
+    }
+    checkpoint.update(status='converting', error=None)
+    launch_conversion(job, job_id, record['output_format'], options, checkpoint)
+    
+    return api_response(data={
+        'job_id': job_id,
+        'status': 'converting',
+        'resumed_pages': checkpoint.completed_count()
+    })
+
+
+@api_bp.route('/resumable', methods=['GET'])
+def list_resumable():
+    jobs = []
+    for checkpoint in checkpoint_store.list():
+        if checkpoint.job_id in conversion_jobs and conversion_jobs[checkpoint.job_id]['status'] == 'converting':
+            continue
+        try:
+            record = checkpoint.record
+        except (OSError, ValueError):
+            continue
+        jobs.append({
+            'job_id': checkpoint.job_id,
+            'filename': record['original_filename'],
+            'output_format': record['output_format'],
+            'requires_password': record.get('requires_password', False),
+            'status': record['status'],
+            'error': record.get('error'),
+            'completed_pages': checkpoint.completed_count()
+        })
+    return api_response(data={'jobs': jobs})
 
 
-def run_conversion(job, output_format, options, progress_callback):
+def run_conversion(job, output_format, options, progress_callback, page_callback=None, checkpoint=None, token_callback=None):
     file_type = job['file_type']
     
     if output_format.startswith('ocr-'):
@@ -305,14 +399,14 @@ def run_conversion(job, output_format, options, progress_callback):
             converter = VideoConverter(progress_callback)
         elif file_type == 'image':
             if options.get('force_ocr'):
-                converter = OCRService(progress_callback)
+                converter = OCRService(progress_callback, page_callback, checkpoint, token_callback)
             else:
                 converter = ImageConverter(progress_callback)
         elif file_type == 'document':
             if options.get('force_ocr'):
-                converter = OCRService(progress_callback)
+                converter = OCRService(progress_callback, page_callback, checkpoint, token_callback)
             else:
-                converter = DocumentConverter(progress_callback)
+                converter = DocumentConverter(progress_callback, checkpoint)
         else:
             raise UnsupportedFormatError(file_type)
         
@@ -321,6 +415,7 @@ def run_conversion(job, output_format, options, progress_callback):
         job['status'] = 'completed'
         job['progress'] = 100
         job['output_path'] = result_path
+        job['metrics'] = getattr(converter, 'metrics', None) or None
         
         try:
             input_size = os.path.getsize(input_path)
@@ -330,11 +425,20 @@ def run_conversion(job, output_format, options, progress_callback):
         except Exception:
             pass
         
-        emit_complete(job['job_id'], os.path.basename(result_path))
+        if checkpoint:
+            checkpoint.remove()
+        
+        emit_complete(job['job_id'], os.path.basename(result_path), job['metrics'])
         
     except Exception as e:
         job['status'] = 'failed'
         job['error'] = str(e)
+        if checkpoint:
+            job['resumable'] = True
+            try:
+                checkpoint.update(status='failed', error=str(e))
+            except Exception:
+                pass
         emit_error(job['job_id'], str(e))
 
 
@@ -350,8 +454,17 @@ def get_status(job_id):
     if job['status'] == 'completed':
         response_data['download_ready'] = True
         response_data['filename'] = os.path.basename(job['output_path'])
+        if job.get('metrics'):
+            response_data['metrics'] = job['metrics']
     elif job['status'] == 'failed':
         response_data['error'] = job.get('error', 'Unknown error')
+        response_data['resumable'] = job.get('resumable', False)
+    
+    if job['status'] != 'completed' and job.get('partial_pages'):
+        response_data['partial_pages'] = job['partial_pages']
+    
+    if job['status'] == 'converting' and os.path.exists(zip_output_path(job['output_path'])):
+        response_data['streamable'] = True
     
     return api_response(data=response_data)
 
@@ -364,6 +477,10 @@ def download_file(job_id):
     job = conversion_jobs[job_id]
     
     if job['status'] != 'completed':
+        if request.args.get('partial') and job.get('partial_pages'):
+            return download_partial(job)
+        if request.args.get('stream') and job['status'] == 'converting':
+            return download_stream(job)
         return api_response(error={'type': 'NotReadyError', 'message': 'Conversion not complete'}, success=False), 400
     
     output_path = job['output_path']
@@ -374,6 +491,42 @@ def download_file(job_id):
     return send_file(output_path, as_attachment=True, download_name=os.path.basename(output_path))
 
 
+def download_partial(job):
+    output_path = job['output_path']
+    
+    if os.path.splitext(output_path)[1].lower() not in ('.txt', '.md', '.html') or not os.path.exists(output_path):
+        return api_response(error={'type': 'NotReadyError', 'message': 'No partial result available for this format'}, success=False), 400
+    
+    with open(output_path, 'rb') as f:
+        data = f.read()
+    
+    name, ext = os.path.splitext(os.path.basename(output_path))
+    return send_file(io.BytesIO(data), as_attachment=True, download_name=f"{name}_partial{ext}")
+
+
+def download_stream(job):
+    zip_path = zip_output_path(job['output_path'])
+    if not os.path.exists(zip_path):
+        return api_response(error={'type': 'NotReadyError', 'message': 'No streamable result available for this job'}, success=False), 400
+    
+    def generate():
+        with open(zip_path, 'rb') as f:
+            while True:
+                data = f.read(STREAM_CHUNK_SIZE)
+                if data:
+                    yield data
+                elif job['status'] == 'converting':
+                    time.sleep(STREAM_POLL_SECONDS)
+                else:
+                    break
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{os.path.basename(zip_path)}"'}
+    )
+
+
 @api_bp.route('/download-archive/<filename>', methods=['GET'])
 def download_archive_file(filename):
     import re
@@ -544,10 +697,147 @@ def run_compression(job, target_size_mb, progress_callback):
         emit_error(job['job_id'], str(e))
 
 
+@api_bp.route('/merge', methods=['POST'])
+def start_merge():
+    data = request.get_json()
+    
+    if not data:
+        return api_response(error={'type': 'InvalidRequestError', 'message': 'JSON body required'}, success=False), 400
+    
+    file_ids = data.get('file_ids') or []
+    options = data.get('options', {})
+    
+    if len(file_ids) < 1:
+        return api_response(error={'type': 'InvalidRequestError', 'message': 'file_ids required'}, success=False), 400
+    
+    missing = [f for f in file_ids if f not in conversion_jobs]
+    if missing:
+        return api_response(error={'type': 'NotFoundError', 'message': f'File not found: {missing[0]}'}, success=False), 404
+    
+    sources = [conversion_jobs[f] for f in file_ids]
+    if any(source['file_type'] not in ('image', 'document') for source in sources):
+        return api_response(error={'type': 'UnsupportedError', 'message': 'Only PDF and image files can be merged'}, success=False), 400
+    
+    output_folder = current_app.config['OUTPUT_FOLDER']
+    base_name = os.path.splitext(sources[0]['original_filename'])[0]
+    output_path = get_output_path(output_folder, f"{base_name}_merged", 'pdf')
+    
+    job_id = generate_file_id()
+    job = {
+        'status': 'merging',
+        'job_id': job_id,
+        'input_paths': [source['input_path'] for source in sources],
+        'original_filename': sources[0]['original_filename'],
+        'file_type': 'document',
+        'output_path': output_path,
+        'progress': 0
+    }
+    conversion_jobs[job_id] = job
+    
+    def progress_callback(progress):
+        job['progress'] = progress
+        emit_progress(job_id, progress, status='merging')
+    
+    thread = threading.Thread(target=run_pdf_assembly, args=(job, 'merge', options, progress_callback))
+    thread.start()
+    
+    return api_response(data={'job_id': job_id, 'status': 'merging'})
+
+
+@api_bp.route('/split', methods=['POST'])
+def start_split():
+    data = request.get_json()
+    
+    if not data:
+        return api_response(error={'type': 'InvalidRequestError', 'message': 'JSON body required'}, success=False), 400
+    
+    file_id = data.get('file_id')
+    options = data.get('options', {})
+    
+    if not file_id:
+        return api_response(error={'type': 'InvalidRequestError', 'message': 'file_id required'}, success=False), 400
+    
+    if file_id not in conversion_jobs:
+        return api_response(error={'type': 'NotFoundError', 'message': 'File not found'}, success=False), 404
+    
+    source = conversion_jobs[file_id]
+    if get_file_extension(source['original_filename']) != 'pdf':
+        return api_response(error={'type': 'UnsupportedError', 'message': 'Only PDF files can be split'}, success=False), 400
+    
+    output_folder = current_app.config['OUTPUT_FOLDER']
+    output_path = get_output_path(output_folder, source['original_filename'], 'zip')
+    
+    job_id = generate_file_id()
+    job = {
+        'status': 'splitting',
+        'job_id': job_id,
+        'input_paths': [source['input_path']],
+        'original_filename': source['original_filename'],
+        'file_type': 'document',
+        'output_path': output_path,
+        'progress': 0
+    }
+    conversion_jobs[job_id] = job
+    
+    def progress_callback(progress):
+        job['progress'] = progress
+        emit_progress(job_id, progress, status='splitting')
+    
+    thread = threading.Thread(target=run_pdf_assembly, args=(job, 'split', options, progress_callback))
+    thread.start()
+    
+    return api_response(data={'job_id': job_id, 'status': 'splitting'})
+
+
+def run_pdf_assembly(job, operation, options, progress_callback):
+    try:
+        assembler = PDFAssembler(progress_callback)
+        
+        if operation == 'merge':
+            result_path = assembler.assemble(job['input_paths'], job['output_path'], options.get('password'))
+        else:
+            result_path = assembler.split(
+                job['input_paths'][0],
+                job['output_path'],
+                ranges=options.get('ranges'),
+                pages_per_file=options.get('pages_per_file'),
+                password=options.get('password')
+            )
+        
+        job['status'] = 'completed'
+        job['progress'] = 100
+        job['output_path'] = result_path
+        
+        try:
+            input_size = sum(os.path.getsize(p) for p in job['input_paths'])
+            output_size = os.path.getsize(result_path)
+            stats.record_conversion('pdf', operation, input_size, output_size)
+        except Exception:
+            pass
+        
+        emit_complete(job['job_id'], os.path.basename(result_path))
+        
+    except Exception as e:
+        job['status'] = 'failed'
+        job['error'] = str(e)
+        emit_error(job['job_id'], str(e))
+
+
 @api_bp.errorhandler(RequestEntityTooLarge)
 def handle_file_too_large(e):
     max_size = current_app.config.get('MAX_CONTENT_LENGTH', 0) / (1024 * 1024)
     return api_response(error={'type': 'FileTooLargeError', 'message': f'File exceeds maximum size of {max_size:.0f}MB'}, success=False), 413
+
+
+@api_bp.route('/llm/stats', methods=['GET'])
+def llm_stats():
+    from ..services.llm_client import llm_client
+    from ..services.llm_cache import llm_cache
+    stats = llm_client.get_stats()
+    stats['cache'] = llm_cache.get_stats()
+    return api_response(data=stats)
+
+
 @api_bp.route('/chat', methods=['POST'])
 def chat():
     data = request.get_json()
@@ -13,12 +13,29 @@ def emit_progress(job_id, progress, status='converting'):
         'status': status
     })
 
-def emit_complete(job_id, filename):
-    socketio.emit('conversion_complete', {
+def emit_partial(job_id, page, content):
+    socketio.emit('conversion_partial', {
+        'job_id': job_id,
+        'page': page,
+        'content': content
+    })
+
+def emit_tokens(job_id, page, content):
+    socketio.emit('conversion_tokens', {
+        'job_id': job_id,
+        'page': page,
+        'content': content
+    })
+
+def emit_complete(job_id, filename, metrics=None):
+    payload = {
         'job_id': job_id,
         'filename': filename,
         'status': 'completed'
-    })
+    }
+    if metrics:
+        payload['metrics'] = metrics
+    socketio.emit('conversion_complete', payload)
 
 def emit_error(job_id, error_message):
     socketio.emit('conversion_error', {
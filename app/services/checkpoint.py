@@ -0,0 +1,145 @@
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+from ..config import Config
+from ..utils.file_handler import link_or_copy_file
+
+
+class JobCheckpoint:
+    RECORD_FILE = 'job.json'
+    PAGES_FILE = 'pages.jsonl'
+    TEXT_PAGES_FILE = 'text_pages.jsonl'
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    @property
+    def job_id(self) -> str:
+        return self.path.name
+
+    @property
+    def record(self) -> Dict[str, Any]:
+        with open(self.path / self.RECORD_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @property
+    def input_path(self) -> str:
+        return str(self.path / self.record['input_name'])
+
+    @property
+    def text_pages_path(self) -> str:
+        return str(self.path / self.TEXT_PAGES_FILE)
+
+    def write_record(self, record: Dict[str, Any]) -> None:
+        temp_path = self.path / f"{self.RECORD_FILE}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, indent=4)
+        os.replace(temp_path, self.path / self.RECORD_FILE)
+
+    def update(self, **fields) -> None:
+        with self._lock:
+            record = self.record
+            record.update(fields, updated=time.time())
+            self.write_record(record)
+
+    def completed_pages(self) -> Dict[int, str]:
+        pages = {}
+        try:
+            with open(self.path / self.PAGES_FILE, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    pages[entry['index']] = entry['content']
+        except OSError:
+            pass
+        return pages
+
+    def completed_count(self) -> int:
+        pages = self.completed_pages()
+        if pages:
+            return len(pages)
+        try:
+            with open(self.text_pages_path, 'rb') as f:
+                return max(0, sum(1 for line in f if line.endswith(b'\n')) - 1)
+        except OSError:
+            return 0
+
+    def save_page(self, index: int, content: str) -> None:
+        line = json.dumps({'index': index, 'content': content}, ensure_ascii=False) + '\n'
+        with self._lock:
+            with open(self.path / self.PAGES_FILE, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def remove(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+class CheckpointStore:
+    SECRET_OPTIONS = ('password',)
+
+    def __init__(self, folder: Path):
+        self.folder = Path(folder)
+
+    def create(self, job_id: str, job: Dict[str, Any], output_format: str, options: Dict[str, Any]) -> JobCheckpoint:
+        path = self.folder / job_id
+        path.mkdir(parents=True, exist_ok=True)
+
+        input_name = 'input' + os.path.splitext(job['input_path'])[1]
+        link_or_copy_file(job['input_path'], str(path / input_name))
+
+        checkpoint = JobCheckpoint(path)
+        checkpoint.write_record({
+            'job_id': job_id,
+            'input_name': input_name,
+            'original_filename': job['original_filename'],
+            'file_type': job['file_type'],
+            'output_format': output_format,
+            'options': {name: value for name, value in options.items() if name not in self.SECRET_OPTIONS},
+            'requires_password': bool(options.get('password')),
+            'status': 'converting',
+            'created': time.time(),
+            'updated': time.time()
+        })
+        return checkpoint
+
+    def load(self, job_id: str) -> Optional[JobCheckpoint]:
+        try:
+            if str(uuid.UUID(job_id)) != job_id:
+                return None
+        except (TypeError, ValueError):
+            return None
+        path = self.folder / job_id
+        if not (path / JobCheckpoint.RECORD_FILE).exists():
+            return None
+        return JobCheckpoint(path)
+
+    def list(self) -> List[JobCheckpoint]:
+        if not self.folder.exists():
+            return []
+        return [
+            JobCheckpoint(path) for path in self.folder.iterdir()
+            if (path / JobCheckpoint.RECORD_FILE).exists()
+        ]
+
+    def cleanup(self, max_age_hours: float) -> None:
+        cutoff = time.time() - max_age_hours * 3600
+        for checkpoint in self.list():
+            try:
+                if checkpoint.record.get('updated', 0) < cutoff:
+                    checkpoint.remove()
+            except (OSError, ValueError):
+                checkpoint.remove()
+
+
+checkpoint_store = CheckpointStore(Config.CHECKPOINT_FOLDER)
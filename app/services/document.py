@@ -1,5 +1,8 @@
-from typing import Optional, Dict, Any
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional, Dict, Any, Iterator, Callable, List
 import html
+import os
+import re
 
 from .converter import BaseConverter
 from ..utils.exceptions import (
@@ -10,9 +13,62 @@ from ..utils.exceptions import (
 )
 
 
+NUMBERED_ITEM_RE = re.compile(r'^(\d+)[\.\)]\s+(.+)')
+BULLET_ITEM_RE = re.compile(r'^[\-\*\•]\s+')
+
+HTML_DOCUMENT_HEAD = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Document</title>
+    <style>
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            line-height: 1.6;
+            max-width: 800px;
+            margin: 0 auto;
+            padding: 20px;
+            color: #333;
+        }
+        p {
+            margin-bottom: 1em;
+        }
+    </style>
+</head>
+<body>
+'''
+
+HTML_DOCUMENT_TAIL = '''</body>
+</html>'''
+
+
+def _parse_docx_pages(input_path: str, password: Optional[str], page_indexes: List[int], settings: Dict[str, Any]) -> Dict[str, Any]:
+    from pdf2docx import Converter
+    
+    cv = Converter(input_path, password=password)
+    try:
+        cv.load_pages(pages=page_indexes)
+        cv.parse_document(**settings).parse_pages(**settings)
+        return cv.store()
+    finally:
+        cv.close()
+
+
 class DocumentConverter(BaseConverter):
     INPUT_FORMATS = {'pdf', 'md'}
-    OUTPUT_FORMATS = {'docx', 'txt', 'pdf', 'pdf_ocr', 'md', 'html'}
+    OUTPUT_FORMATS = {'docx', 'txt', 'pdf', 'pdf_ocr', 'md', 'html', 'png', 'jpg', 'jpeg', 'webp'}
+    IMAGE_OUTPUT_FORMATS = {'png', 'jpg', 'jpeg', 'webp'}
+    DEFAULT_DPI = 150
+    MAX_DPI = 600
+    H1_SIZE_RATIO = 1.6
+    H2_SIZE_RATIO = 1.2
+    DOCX_PARALLEL_MIN_PAGES = 16
+    DOCX_PAGES_PER_TASK = 4
+    
+    def __init__(self, progress_callback: Optional[Callable[[int], None]] = None, checkpoint=None):
+        super().__init__(progress_callback)
+        self.checkpoint = checkpoint
     
     def convert(
         self,
@@ -39,6 +95,8 @@ class DocumentConverter(BaseConverter):
             if input_path.lower().endswith('.md'):
                 return self._md_to_pdf(input_path, output_path, options)
             raise ConversionError("PDF output only supported from Markdown input")
+        elif output_format in self.IMAGE_OUTPUT_FORMATS:
+            return self._pdf_to_images(input_path, output_path, output_format, options)
         elif output_format == 'pdf_ocr':
             from .ocr import OCRService
             ocr = OCRService(self._progress_callback)
@@ -48,24 +106,38 @@ class DocumentConverter(BaseConverter):
     
     def _pdf_to_docx(self, input_path: str, output_path: str, options: Dict[str, Any]) -> str:
         from pdf2docx import Converter
+        from .pdf_text import resolve_page_range
         
+        password = options.get('password')
+        cv = None
         try:
-            self.report_progress(10)
-            password = options.get('password')
+            self.report_progress(5)
             cv = Converter(input_path, password=password)
-            self.report_progress(30)
+            start, end = resolve_page_range(len(cv.fitz_doc), options.get('start_page'), options.get('end_page'))
+            settings = cv.default_settings
+            cv.load_pages(start, end)
+            self.report_progress(10)
+            
+            page_indexes = list(range(start, end))
+            max_workers = options.get('max_workers') or os.cpu_count() or 1
+            parallel = options.get('parallel', len(page_indexes) >= self.DOCX_PARALLEL_MIN_PAGES)
+            
+            if parallel and max_workers > 1 and len(page_indexes) > 1:
+                self._parse_docx_parallel(cv, input_path, password, page_indexes, settings, max_workers)
+            else:
+                self._parse_docx_sequential(cv, settings)
             
             if self.is_cancelled:
-                cv.close()
                 return None
             
-            cv.convert(output_path, start=0, end=None)
-            self.report_progress(90)
-            cv.close()
+            self.report_progress(85)
+            cv.make_docx(output_path, **settings)
             self.report_progress(100)
             
             return output_path
             
+        except ConversionError:
+            raise
         except Exception as e:
             error_msg = str(e).lower()
             if 'password' in error_msg or 'encrypted' in error_msg:
@@ -73,208 +145,261 @@ class DocumentConverter(BaseConverter):
                     raise InvalidPasswordError()
                 raise PasswordRequiredError()
             raise ConversionError(f"PDF to DOCX conversion failed: {str(e)}")
+        finally:
+            if cv is not None:
+                cv.close()
     
-    def _pdf_to_text(self, input_path: str, output_path: str, options: Dict[str, Any]) -> str:
-        from pdfminer.high_level import extract_text
-        from pypdf import PdfReader
+    def _report_docx_pages(self, done: int, total: int) -> None:
+        self.report_progress(20 + int(done / total * 65))
+    
+    def _parse_docx_sequential(self, cv, settings: Dict[str, Any]) -> None:
+        cv.parse_document(**settings)
+        self.report_progress(20)
         
+        pages = [page for page in cv.pages if not page.skip_parsing]
+        for done, page in enumerate(pages, start=1):
+            if self.is_cancelled:
+                return
+            try:
+                page.parse(**settings)
+            except Exception as e:
+                if not settings['ignore_page_error']:
+                    raise ConversionError(f"Error when parsing page {page.id + 1}: {str(e)}")
+            self._report_docx_pages(done, len(pages))
+    
+    def _parse_docx_parallel(
+        self,
+        cv,
+        input_path: str,
+        password: Optional[str],
+        page_indexes: List[int],
+        settings: Dict[str, Any],
+        max_workers: int
+    ) -> None:
+        chunks = [
+            page_indexes[i:i + self.DOCX_PAGES_PER_TASK]
+            for i in range(0, len(page_indexes), self.DOCX_PAGES_PER_TASK)
+        ]
+        self.report_progress(20)
+        
+        done = 0
+        executor = ProcessPoolExecutor(max_workers=min(max_workers, len(chunks)))
         try:
-            self.report_progress(10)
+            futures = [
+                executor.submit(_parse_docx_pages, input_path, password, chunk, settings)
+                for chunk in chunks
+            ]
+            for future in as_completed(futures):
+                if self.is_cancelled:
+                    return
+                parsed = future.result()
+                cv.restore(parsed)
+                done += len(parsed['pages'])
+                self._report_docx_pages(done, len(page_indexes))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _pdf_to_images(self, input_path: str, output_path: str, output_format: str, options: Dict[str, Any]) -> str:
+        from .pdf_raster import PDFRasterizer, zip_output_path
+        from .pdf_text import open_pdf, resolve_page_range
+        
+        if not input_path.lower().endswith('.pdf'):
+            raise ConversionError("Image output only supported from PDF input")
+        
+        try:
+            self.report_progress(5)
             password = options.get('password')
+            doc = open_pdf(input_path, password)
+            page_count = len(doc)
+            doc.close()
+            
+            start, end = resolve_page_range(page_count, options.get('start_page'), options.get('end_page'))
+            dpi = max(36, min(self.MAX_DPI, int(options.get('dpi', self.DEFAULT_DPI))))
+            
+            def on_page(done: int, total: int):
+                self.report_progress(10 + int(done / total * 85))
+            
+            rasterizer = PDFRasterizer(
+                input_path,
+                password=password,
+                dpi=dpi,
+                image_format=output_format,
+                quality=options.get('quality', 90),
+                max_workers=options.get('max_workers'),
+                progress_callback=on_page
+            )
             
-            reader = PdfReader(input_path)
-            if reader.is_encrypted:
-                if password:
-                    if not reader.decrypt(password):
-                        raise InvalidPasswordError()
-                else:
-                    raise PasswordRequiredError()
-            
-            self.report_progress(30)
-            text = extract_text(input_path, password=password)
-            self.report_progress(80)
+            if end - start == 1:
+                result = rasterizer.render_single(start, output_path)
+            else:
+                zip_path = zip_output_path(output_path)
+                result = rasterizer.render_to_zip(
+                    list(range(start, end)), page_count, zip_path, lambda: self.is_cancelled
+                )
             
-            if self.is_cancelled:
+            if result is None:
                 return None
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(text)
-            
             self.report_progress(100)
-            return output_path
+            return result
             
+        except (ConversionError, PasswordRequiredError, InvalidPasswordError):
+            raise
+        except Exception as e:
+            raise ConversionError(f"PDF to image conversion failed: {str(e)}")
+    
+    def _iter_pdf_pages(self, input_path: str, options: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        from .pdf_text import iter_pdf_pages
+        
+        def on_page(done: int, total: int):
+            self.report_progress(10 + int(done / total * 85))
+        
+        for page in iter_pdf_pages(
+            input_path,
+            password=options.get('password'),
+            max_workers=options.get('max_workers'),
+            progress_callback=on_page,
+            partial_path=self.checkpoint.text_pages_path if self.checkpoint else None
+        ):
+            if self.is_cancelled:
+                return
+            yield page
+    
+    def _write_pdf_rendering(
+        self,
+        input_path: str,
+        output_path: str,
+        options: Dict[str, Any],
+        renderer: Callable[[Iterator[Dict[str, Any]]], Iterator[str]]
+    ) -> Optional[str]:
+        self.report_progress(5)
+        pages = self._iter_pdf_pages(input_path, options)
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for chunk in renderer(pages):
+                f.write(chunk)
+        
+        if self.is_cancelled:
+            return None
+        
+        self.report_progress(100)
+        return output_path
+    
+    def _pdf_to_text(self, input_path: str, output_path: str, options: Dict[str, Any]) -> str:
+        try:
+            return self._write_pdf_rendering(input_path, output_path, options, self._render_text)
         except (PasswordRequiredError, InvalidPasswordError):
             raise
         except Exception as e:
             raise ConversionError(f"Text extraction failed: {str(e)}")
     
     def _pdf_to_md(self, input_path: str, output_path: str, options: Dict[str, Any]) -> str:
-        from pdfminer.high_level import extract_text
-        from pypdf import PdfReader
-        
         try:
-            self.report_progress(10)
-            password = options.get('password')
-            
-            reader = PdfReader(input_path)
-            if reader.is_encrypted:
-                if password:
-                    if not reader.decrypt(password):
-                        raise InvalidPasswordError()
-                else:
-                    raise PasswordRequiredError()
-            
-            self.report_progress(30)
-            text = extract_text(input_path, password=password)
-            self.report_progress(70)
-            
-            if self.is_cancelled:
-                return None
-            
-            md_content = self._text_to_markdown(text)
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(md_content)
-            
-            self.report_progress(100)
-            return output_path
-            
+            return self._write_pdf_rendering(input_path, output_path, options, self._render_markdown)
         except (PasswordRequiredError, InvalidPasswordError):
             raise
         except Exception as e:
             raise ConversionError(f"Markdown conversion failed: {str(e)}")
     
     def _pdf_to_html(self, input_path: str, output_path: str, options: Dict[str, Any]) -> str:
-        from pdfminer.high_level import extract_text
-        from pypdf import PdfReader
-        
         try:
-            self.report_progress(10)
-            password = options.get('password')
-            
-            reader = PdfReader(input_path)
-            if reader.is_encrypted:
-                if password:
-                    if not reader.decrypt(password):
-                        raise InvalidPasswordError()
-                else:
-                    raise PasswordRequiredError()
-            
-            self.report_progress(30)
-            text = extract_text(input_path, password=password)
-            self.report_progress(70)
-            
-            if self.is_cancelled:
-                return None
-            
-            html_content = self._text_to_html(text)
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            self.report_progress(100)
-            return output_path
-            
+            return self._write_pdf_rendering(input_path, output_path, options, self._render_html)
         except (PasswordRequiredError, InvalidPasswordError):
             raise
         except Exception as e:
             raise ConversionError(f"HTML conversion failed: {str(e)}")
     
-    def _text_to_markdown(self, text: str) -> str:
-        import re
-        lines = text.split('\n')
-        md_lines = []
+    def _heading_level(self, block: Dict[str, Any], body_size: float) -> int:
+        text = block['text'].strip()
+        if not body_size or len(text) >= 120 or '\n' in text:
+            return 0
+        if block['size'] >= body_size * self.H1_SIZE_RATIO:
+            return 1
+        if block['size'] >= body_size * self.H2_SIZE_RATIO:
+            return 2
+        return 0
+    
+    def _render_text(self, pages: Iterator[Dict[str, Any]]) -> Iterator[str]:
+        from .pdf_text import page_text
+        
+        for page in pages:
+            yield page_text(page) + '\f'
+    
+    def _render_markdown(self, pages: Iterator[Dict[str, Any]]) -> Iterator[str]:
         prev_empty = True
         
-        for i, line in enumerate(lines):
-            stripped = line.strip()
-            
-            if not stripped:
-                md_lines.append('')
-                prev_empty = True
-                continue
-            
-            if re.match(r'^\d+[\.\)]\s+', stripped):
-                match = re.match(r'^(\d+)[\.\)]\s+(.+)', stripped)
-                if match:
-                    md_lines.append(f"{match.group(1)}. {match.group(2)}")
-                    prev_empty = False
+        for page in pages:
+            md_lines = []
+            for block in page['blocks']:
+                level = self._heading_level(block, page['body_size'])
+                if level:
+                    md_lines.append(f"{'#' * level} {block['text'].strip()}")
+                    md_lines.append('')
+                    prev_empty = True
                     continue
-            
-            if re.match(r'^[\-\*\•]\s+', stripped):
-                content = re.sub(r'^[\-\*\•]\s+', '', stripped)
-                md_lines.append(f"- {content}")
-                prev_empty = False
-                continue
-            
-            if (len(stripped) < 60 and 
-                prev_empty and 
-                not stripped.endswith((',', ';', ':')) and
-                (stripped.isupper() or stripped.istitle() or stripped[0].isupper())):
                 
-                next_empty = (i + 1 >= len(lines) or not lines[i + 1].strip())
-                
-                if stripped.isupper() and len(stripped) < 40:
-                    md_lines.append(f"# {stripped.title()}")
-                elif next_empty or len(stripped) < 30:
-                    md_lines.append(f"## {stripped}")
-                else:
+                lines = block['text'].split('\n')
+                for i, line in enumerate(lines):
+                    stripped = line.strip()
+                    
+                    if not stripped:
+                        continue
+                    
+                    match = NUMBERED_ITEM_RE.match(stripped)
+                    if match:
+                        md_lines.append(f"{match.group(1)}. {match.group(2)}")
+                        prev_empty = False
+                        continue
+                    
+                    match = BULLET_ITEM_RE.match(stripped)
+                    if match:
+                        md_lines.append(f"- {stripped[match.end():]}")
+                        prev_empty = False
+                        continue
+                    
+                    if (len(stripped) < 60 and 
+                        prev_empty and 
+                        not stripped.endswith((',', ';', ':')) and
+                        (stripped.isupper() or stripped.istitle() or stripped[0].isupper())):
+                        
+                        next_empty = i + 1 >= len(lines)
+                        
+                        if stripped.isupper() and len(stripped) < 40:
+                            md_lines.append(f"# {stripped.title()}")
+                        elif next_empty or len(stripped) < 30:
+                            md_lines.append(f"## {stripped}")
+                        else:
+                            md_lines.append(stripped)
+                        prev_empty = False
+                        continue
+                    
                     md_lines.append(stripped)
-                prev_empty = False
-                continue
+                    prev_empty = False
+                
+                md_lines.append('')
+                prev_empty = True
             
-            md_lines.append(stripped)
-            prev_empty = False
-        
-        return '\n'.join(md_lines)
+            if md_lines:
+                yield '\n'.join(md_lines) + '\n'
     
-    def _text_to_html(self, text: str) -> str:
-        lines = text.split('\n')
-        paragraphs = []
-        current_para = []
-        
-        for line in lines:
-            stripped = line.strip()
-            if not stripped:
-                if current_para:
-                    paragraphs.append(' '.join(current_para))
-                    current_para = []
-            else:
-                current_para.append(stripped)
+    def _render_html(self, pages: Iterator[Dict[str, Any]]) -> Iterator[str]:
+        yield HTML_DOCUMENT_HEAD
         
-        if current_para:
-            paragraphs.append(' '.join(current_para))
-        
-        body_content = '\n'.join(f'<p>{html.escape(p)}</p>' for p in paragraphs if p)
+        for page in pages:
+            elements = []
+            for block in page['blocks']:
+                text = ' '.join(line.strip() for line in block['text'].split('\n') if line.strip())
+                if not text:
+                    continue
+                level = self._heading_level(block, page['body_size'])
+                tag = f'h{level}' if level else 'p'
+                elements.append(f'<{tag}>{html.escape(text)}</{tag}>\n')
+            yield ''.join(elements)
         
-        return f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Document</title>
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            line-height: 1.6;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            color: #333;
-        }}
-        p {{
-            margin-bottom: 1em;
-        }}
-    </style>
-</head>
-<body>
-{body_content}
-</body>
-</html>'''
+        yield HTML_DOCUMENT_TAIL
     
     def _md_to_pdf(self, input_path: str, output_path: str, options: Dict[str, Any]) -> str:
-        import markdown
-        from weasyprint import HTML
+        from .markdown_pdf import markdown_pdf_renderer
         
         try:
             self.report_progress(10)
@@ -287,80 +412,7 @@ class DocumentConverter(BaseConverter):
             if self.is_cancelled:
                 return None
             
-            html_content = markdown.markdown(
-                md_content,
-                extensions=['tables', 'fenced_code', 'codehilite', 'toc']
-            )
-            
-            self.report_progress(50)
-            
-            full_html = f'''
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            line-height: 1.6;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            color: #333;
-        }}
-        h1, h2, h3, h4, h5, h6 {{
-            margin-top: 1.5em;
-            margin-bottom: 0.5em;
-            color: #1a1a1a;
-        }}
-        code {{
-            background: #f4f4f4;
-            padding: 2px 6px;
-            border-radius: 3px;
-            font-family: 'Consolas', 'Monaco', monospace;
-        }}
-        pre {{
-            background: #f4f4f4;
-            padding: 15px;
-            border-radius: 5px;
-            overflow-x: auto;
-        }}
-        pre code {{
-            background: none;
-            padding: 0;
-        }}
-        blockquote {{
-            border-left: 4px solid #ddd;
-            margin: 0;
-            padding-left: 20px;
-            color: #666;
-        }}
-        table {{
-            border-collapse: collapse;
-            width: 100%;
-        }}
-        th, td {{
-            border: 1px solid #ddd;
-            padding: 8px 12px;
-            text-align: left;
-        }}
-        th {{
-            background: #f4f4f4;
-        }}
-        a {{
-            color: #0066cc;
-        }}
-    </style>
-</head>
-<body>
-{html_content}
-</body>
-</html>
-'''
-            
-            self.report_progress(70)
-            
-            HTML(string=full_html).write_pdf(output_path)
+            markdown_pdf_renderer.render(md_content, output_path)
             
             self.report_progress(100)
             return output_path
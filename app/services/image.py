@@ -3,6 +3,7 @@ from PIL import Image
 
 from .converter import BaseConverter
 from ..utils.exceptions import ConversionError, UnsupportedFormatError
+from ..utils.file_handler import link_or_copy_file
 
 
 class ImageConverter(BaseConverter):
@@ -13,6 +14,10 @@ class ImageConverter(BaseConverter):
     
     OUTPUT_FORMATS = {'png', 'jpg', 'jpeg', 'webp', 'gif', 'bmp', 'tiff', 'ico', 'pdf', 'txt', 'pdf_ocr'}
     RGB_ONLY_FORMATS = {'jpg', 'jpeg', 'bmp', 'pdf'}
+    ANIMATED_FORMATS = {'gif', 'webp'}
+    PIL_FORMAT_MAP = {'jpg': 'JPEG', 'jpeg': 'JPEG', 'tiff': 'TIFF', 'tif': 'TIFF'}
+    REENCODE_OPTIONS = {'width', 'height', 'rotate', 'quality'}
+    DEFAULT_FRAME_DURATION = 100
     DEFAULT_QUALITY = 90
     
     def __init__(self, *args, **kwargs):
@@ -48,25 +53,18 @@ class ImageConverter(BaseConverter):
             elif output_format == 'pdf_ocr':
                 try:
                     self.report_progress(10)
-                    import tempfile
+                    import io
                     
-                    temp_pdf = tempfile.mktemp(suffix=".pdf")
+                    pdf_buffer = io.BytesIO()
                     image = Image.open(input_path)
                     if image.mode != 'RGB':
                         image = image.convert('RGB')
-                    image.save(temp_pdf, "PDF", resolution=100.0)
+                    image.save(pdf_buffer, "PDF", resolution=100.0)
+                    del image
                     
                     self.report_progress(30)
                     
-                    result = ocr.ocr_pdf_to_searchable(temp_pdf, output_path, options)
-                    
-                    try:
-                        import os
-                        os.remove(temp_pdf)
-                    except:
-                        pass
-                        
-                    return result
+                    return ocr.ocr_pdf_to_searchable(pdf_buffer.getvalue(), output_path, options)
                     
                 except Exception as e:
                     raise ConversionError(str(e))
@@ -79,6 +77,15 @@ class ImageConverter(BaseConverter):
             if self.is_cancelled:
                 return None
             
+            if self._is_identity(image, output_format, options):
+                image.close()
+                link_or_copy_file(input_path, output_path)
+                self.report_progress(100)
+                return output_path
+            
+            if self._should_animate(image, output_format, options):
+                return self._convert_animated(image, output_path, output_format, options)
+            
             image = self._apply_options(image, options)
             self.report_progress(50)
             
@@ -98,6 +105,66 @@ class ImageConverter(BaseConverter):
         except Exception as e:
             raise ConversionError(f"Image conversion failed: {str(e)}")
     
+    def _is_identity(self, image: Image.Image, output_format: str, options: Dict[str, Any]) -> bool:
+        if output_format == 'ico':
+            return False
+        if image.format != self.PIL_FORMAT_MAP.get(output_format, output_format.upper()):
+            return False
+        if any(options.get(key) for key in self.REENCODE_OPTIONS):
+            return False
+        max_dim = options.get('max_dimension')
+        if max_dim and (image.width > max_dim or image.height > max_dim):
+            return False
+        if getattr(image, 'is_animated', False) and not options.get('animated', True):
+            return False
+        return True
+    
+    def _should_animate(self, image: Image.Image, output_format: str, options: Dict[str, Any]) -> bool:
+        return (
+            output_format in self.ANIMATED_FORMATS and
+            getattr(image, 'is_animated', False) and
+            options.get('animated', True)
+        )
+    
+    def _convert_animated(
+        self,
+        image: Image.Image,
+        output_path: str,
+        output_format: str,
+        options: Dict[str, Any]
+    ) -> str:
+        total_frames = image.n_frames
+        loop = image.info.get('loop', 0)
+        durations = []
+        
+        def frame(index: int) -> Image.Image:
+            if self.is_cancelled:
+                raise ConversionError("Conversion cancelled")
+            image.seek(index)
+            current = image.convert('RGBA')
+            # WebP only fills in the frame duration once the frame is loaded.
+            durations.append(image.info.get('duration') or self.DEFAULT_FRAME_DURATION)
+            current = self._apply_options(current, options)
+            self.report_progress(30 + int((index + 1) / total_frames * 65))
+            return current
+        
+        first = frame(0)
+        
+        save_options = self._get_save_options(output_format, options)
+        save_options.update(
+            save_all=True,
+            append_images=(frame(index) for index in range(1, total_frames)),
+            duration=durations,
+            loop=loop
+        )
+        if output_format == 'gif':
+            save_options['disposal'] = 2
+        
+        first.save(output_path, **save_options)
+        
+        self.report_progress(100)
+        return output_path
+    
     def _apply_options(self, image: Image.Image, options: Dict[str, Any]) -> Image.Image:
         if 'width' in options or 'height' in options:
             width = options.get('width')
@@ -142,8 +209,7 @@ class ImageConverter(BaseConverter):
     
     def _get_save_options(self, output_format: str, options: Dict[str, Any]) -> Dict[str, Any]:
         save_options = {}
-        format_map = {'jpg': 'JPEG', 'jpeg': 'JPEG', 'tiff': 'TIFF', 'tif': 'TIFF'}
-        save_options['format'] = format_map.get(output_format, output_format.upper())
+        save_options['format'] = self.PIL_FORMAT_MAP.get(output_format, output_format.upper())
         
         if output_format in {'jpg', 'jpeg', 'webp'}:
             save_options['quality'] = options.get('quality', self.DEFAULT_QUALITY)
@@ -0,0 +1,189 @@
+import gc
+import io
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional, List, Tuple
+
+from ..config import Config
+
+
+MODEL_ID = "lightonai/LightOnOCR-2-1B-base"
+DEFAULT_MAX_NEW_TOKENS = 1024
+
+logger = logging.getLogger(__name__)
+
+
+class LightOnServer:
+    def __init__(
+        self,
+        max_batch_size: int = 4,
+        max_wait: float = 0.05,
+        device: Optional[str] = None,
+        quantize: bool = False,
+        num_threads: Optional[int] = None,
+        interop_threads: int = 1
+    ):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.quantize = quantize
+        self.num_threads = num_threads
+        self.interop_threads = interop_threads
+        self._device = device
+        self.model = None
+        self.processor = None
+        self.device = None
+        self.dtype = None
+        self._requests = queue.Queue()
+        self._load_lock = threading.Lock()
+        self._worker = None
+
+    def load(self) -> None:
+        if self._worker is not None:
+            return
+
+        with self._load_lock:
+            if self._worker is not None:
+                return
+
+            import torch
+            from transformers import LightOnOcrForConditionalGeneration, LightOnOcrProcessor
+
+            device = self._device or (
+                "mps" if torch.backends.mps.is_available() else "cuda" if torch.cuda.is_available() else "cpu"
+            )
+            dtype = torch.float32 if device in ("mps", "cpu") else torch.bfloat16
+
+            if device == "cpu":
+                self._configure_cpu_threads(torch)
+
+            model = LightOnOcrForConditionalGeneration.from_pretrained(
+                MODEL_ID,
+                torch_dtype=dtype
+            ).to(device)
+            model.eval()
+            if device == "cpu" and self.quantize:
+                model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+            self.model = model
+            self.processor = LightOnOcrProcessor.from_pretrained(MODEL_ID)
+            self.processor.tokenizer.padding_side = 'left'
+            self.device = device
+            self.dtype = dtype
+
+            self._worker = threading.Thread(target=self._serve, name='lighton-server', daemon=True)
+            self._worker.start()
+
+    def _configure_cpu_threads(self, torch) -> None:
+        torch.set_num_threads(max(1, self.num_threads or os.cpu_count() or 1))
+        try:
+            torch.set_num_interop_threads(max(1, self.interop_threads))
+        except RuntimeError:
+            pass
+
+    def preload(self) -> None:
+        def run():
+            try:
+                self.load()
+            except Exception as e:
+                logger.exception("LightOn preload failed: %s", e)
+
+        threading.Thread(target=run, name='lighton-preload', daemon=True).start()
+
+    def unload(self) -> None:
+        with self._load_lock:
+            if self._worker is None:
+                return
+            self._requests.put(None)
+            self._worker.join()
+            self._worker = None
+            self.model = None
+            self.processor = None
+        gc.collect()
+
+    def submit(self, image_data: bytes, max_new_tokens: int = DEFAULT_MAX_NEW_TOKENS) -> Future:
+        self.load()
+        future = Future()
+        self._requests.put((image_data, max_new_tokens, future))
+        return future
+
+    def recognize(self, image_data: bytes, max_new_tokens: int = DEFAULT_MAX_NEW_TOKENS) -> str:
+        return self.submit(image_data, max_new_tokens).result()
+
+    def _next_batch(self) -> Optional[List[Tuple[bytes, int, Future]]]:
+        first = self._requests.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                self._requests.put(None)
+                break
+            batch.append(request)
+        return [request for request in batch if request[2].set_running_or_notify_cancel()]
+
+    def _serve(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            if not batch:
+                continue
+            try:
+                texts = self._generate(
+                    [image_data for image_data, _, _ in batch],
+                    max(tokens for _, tokens, _ in batch)
+                )
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, _, future), text in zip(batch, texts):
+                future.set_result(text)
+
+    def _generate(self, images: List[bytes], max_new_tokens: int) -> List[str]:
+        import torch
+        from PIL import Image
+
+        conversations = [
+            [{"role": "user", "content": [{"type": "image", "image": Image.open(io.BytesIO(data)).convert('RGB')}]}]
+            for data in images
+        ]
+        inputs = self.processor.apply_chat_template(
+            conversations,
+            add_generation_prompt=True,
+            tokenize=True,
+            return_dict=True,
+            return_tensors="pt",
+            padding=True,
+        )
+        inputs = {
+            k: v.to(device=self.device, dtype=self.dtype)
+            if v.is_floating_point() else v.to(self.device)
+            for k, v in inputs.items()
+        }
+
+        with torch.inference_mode():
+            output_ids = self.model.generate(**inputs, max_new_tokens=max_new_tokens)
+        generated_ids = output_ids[:, inputs["input_ids"].shape[1]:]
+        return self.processor.batch_decode(generated_ids, skip_special_tokens=True)
+
+
+lighton_server = LightOnServer(
+    max_batch_size=Config.LIGHTON_MAX_BATCH_SIZE,
+    max_wait=Config.LIGHTON_MAX_WAIT_MS / 1000,
+    quantize=Config.LIGHTON_CPU_QUANTIZE,
+    num_threads=Config.LIGHTON_CPU_THREADS,
+    interop_threads=Config.LIGHTON_CPU_INTEROP_THREADS
+)
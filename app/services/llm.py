@@ -1,30 +1,93 @@
-import requests
 import json
+import logging
 import os
 import base64
+import mimetypes
 from pathlib import Path
+import time
+import html as html_lib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import Union, List, Iterator, Callable, Tuple
+from ..config import Config
+from ..utils.exceptions import GenerationLimitError
+from .llm_client import LLMClient, llm_client
+from .llm_cache import llm_cache, llm_cache_key, is_cacheable
+from .llm_chunks import TextChunk, chunk_text
+
+logger = logging.getLogger(__name__)
 
 class LLMService:
-    def __init__(self, api_url="http://localhost:1234/api/v1/chat"):
+    def __init__(self, api_url="http://localhost:1234/api/v1/chat", client: LLMClient = None, cache=None, deterministic: bool = None):
         self.api_url = api_url
+        self.client = client or llm_client
+        self.cache = cache or llm_cache
+        self.deterministic = Config.LLM_DETERMINISTIC if deterministic is None else deterministic
 
     def _send_request(self, payload):
         try:
-            response = requests.post(
-                self.api_url, 
-                headers={"Content-Type": "application/json"},
-                data=json.dumps(payload),
-                timeout=1800
-            )
-            response.raise_for_status()
-            return response.json()
+            return self.client.post_json(self.api_url, payload)
         except Exception as e:
             print(f"LLM request failed: {str(e)}")
             raise e
 
-    def correct_text(self, text: str, output_format: str = 'txt') -> str:
+    def _message_text(self, result) -> str:
+        if 'output' in result and len(result['output']) > 0:
+            for item in result['output']:
+                if item.get('type') == 'message':
+                    return item['content'].strip()
+        return ""
+
+    def _complete(self, payload) -> str:
+        if self.deterministic:
+            payload = {**payload, "temperature": 0}
+
+        if not is_cacheable(payload):
+            return self._message_text(self._send_request(payload))
+
+        cache_key = llm_cache_key(payload)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        text = self._message_text(self._send_request(payload))
+        if text:
+            self.cache.set(cache_key, text)
+        return text
+
+    def _strip_code_fence(self, text: str, language: str) -> str:
+        if text.startswith(f"```{language}"): text = text[len(language) + 3:]
+        if text.startswith("```"): text = text[3:]
+        if text.endswith("```"): text = text[:-3]
+        return text.strip()
+
+    def _chunk_input(self, chunk: TextChunk, instruction: str) -> str:
+        if not chunk.context:
+            return chunk.text
+        return (
+            "[Preceding text, for context only. Do NOT include it in your output]\n"
+            f"{chunk.context}\n\n"
+            f"[{instruction}]\n"
+            f"{chunk.text}"
+        )
+
+    def _map_chunks(self, chunks: List[TextChunk], handler) -> Tuple[List[str], int]:
+        if len(chunks) == 1:
+            results = [handler(0, chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(Config.LLM_CHUNK_CONCURRENCY, len(chunks))) as executor:
+                results = list(executor.map(handler, range(len(chunks)), chunks))
+        return [text for text, _ in results], sum(1 for _, failed in results if failed)
+
+    def _join_chunks(self, chunks: List[TextChunk], results: List[str]) -> str:
+        return results[0] + ''.join(chunk.separator + result for chunk, result in zip(chunks[1:], results[1:]))
+
+    def _chunks(self, text: str) -> List[TextChunk]:
+        return chunk_text(text, Config.LLM_CHUNK_CHARS, Config.LLM_CHUNK_OVERLAP_CHARS)
+
+    def correct_text(self, text: str, output_format: str = 'txt') -> Tuple[str, int]:
         if not text or not text.strip():
-            return text
+            return text, 0
 
         system_prompt = "You are a specialized post-OCR text correction assistant. Fix OCR errors, typos, and formatting inconsistencies."
         
@@ -39,28 +102,32 @@ class LLMService:
         else:
             system_prompt += " Maintain original meaning and structure. Output ONLY the corrected text."
 
-        payload = {
-            "model": "mistralai/ministral-3-3b", 
-            "system_prompt": system_prompt,
-            "input": text,
-            "temperature": 0.3,
-            "stream": False
-        }
+        chunks = self._chunks(text)
+        if len(chunks) == 1:
+            chunks = [TextChunk(text, '')]
 
-        try:
-            result = self._send_request(payload)
-            if 'output' in result and len(result['output']) > 0:
-                for item in result['output']:
-                    if item.get('type') == 'message':
-                        return item['content'].strip()
-            return text
-        except Exception:
-            return text
-
-    def generate_html(self, text: str, theme: str = 'light', css_limit: int = None) -> str:
-        if not text or not text.strip():
-            return "<html><body></body></html>"
+        def correct_chunk(index: int, chunk: TextChunk) -> Tuple[str, bool]:
+            payload = {
+                "model": "mistralai/ministral-3-3b", 
+                "system_prompt": system_prompt,
+                "input": self._chunk_input(chunk, "Text to correct"),
+                "temperature": 0.3,
+                "stream": False
+            }
+            try:
+                corrected = self._complete(payload)
+            except Exception as e:
+                logger.warning("Text correction failed for chunk %d/%d, keeping the original: %s", index + 1, len(chunks), e)
+                return chunk.text, True
+            if not corrected:
+                logger.warning("Text correction returned nothing for chunk %d/%d, keeping the original", index + 1, len(chunks))
+                return chunk.text, True
+            return corrected, False
+
+        results, failed = self._map_chunks(chunks, correct_chunk)
+        return self._join_chunks(chunks, results), failed
 
+    def _theme_instructions(self, theme: str, css_limit: int = None) -> str:
         if theme == 'dark':
              theme_prompt = "Use a DARK THEME (dark background #1a1a1a, light text #e0e0e0)."
         else:
@@ -70,11 +137,23 @@ class LLMService:
         if css_limit:
             css_limit_instruction = f"IMPORTANT: Limit the CSS styles to approximately {css_limit} characters. Prioritize essential layout and typography."
 
+        return f"{theme_prompt} {css_limit_instruction}"
+
+    def _fallback_html_body(self, text: str) -> str:
+        return f"<p>{html_lib.escape(text).replace(chr(10), '<br>')}</p>"
+
+    def generate_html(self, text: str, theme: str = 'light', css_limit: int = None) -> Tuple[str, int]:
+        if not text or not text.strip():
+            return "<html><body></body></html>", 0
+
+        chunks = self._chunks(text)
+        if len(chunks) > 1:
+            return self._generate_html_chunked(chunks, theme, css_limit)
+
         prompt = (
             "Convert the provided text into clean, semantically correct HTML5. "
             "Use appropriate tags (h1, h2, p, ul, li, etc.). "
-            f"CRITICAL: Add a <style> block in the <head> with CSS to make the document look simple, modern, and beautiful. {theme_prompt} "
-            f"{css_limit_instruction} "
+            f"CRITICAL: Add a <style> block in the <head> with CSS to make the document look simple, modern, and beautiful. {self._theme_instructions(theme, css_limit)} "
             "(e.g., proper typography from Google Fonts like Inter, comfortable spacing, clean layout, subtle shadows). "
             "Format the output as a full HTML document (<!DOCTYPE html>...). "
             "Output ONLY the raw HTML code. Do NOT wrap in markdown code blocks."
@@ -90,32 +169,126 @@ class LLMService:
         }
 
         try:
-            result = self._send_request(payload)
-            html = ""
-            if 'output' in result and len(result['output']) > 0:
-                for item in result['output']:
-                    if item.get('type') == 'message':
-                        html = item['content'].strip()
-                        break
+            html = self._complete(payload)
             
             if not html:
-                return f"<html><body><p>{text}</p></body></html>"
+                logger.warning("HTML generation returned nothing, falling back to plain paragraphs")
+                return f"<html><body>{self._fallback_html_body(text)}</body></html>", 1
 
-            if html.startswith("```html"): html = html[7:]
-            if html.startswith("```"): html = html[3:]
-            if html.endswith("```"): html = html[:-3]
-            return html.strip()
+            return self._strip_code_fence(html, 'html'), 0
 
-        except Exception:
-            return f"<html><body><p>{text.replace(chr(10), '<br>')}</p></body></html>"
+        except Exception as e:
+            logger.warning("HTML generation failed, falling back to plain paragraphs: %s", e)
+            return f"<html><body>{self._fallback_html_body(text)}</body></html>", 1
 
-    def generate_from_image(self, image_path: str, prompt: str = None) -> str:
+    def _generate_stylesheet(self, theme: str, css_limit: int = None) -> str:
+        prompt = (
+            "Write a CSS stylesheet for a long HTML5 document that uses h1, h2, h3, p, ul, ol, li, table, th, td, "
+            "blockquote, code and pre elements. Make it simple, modern, and beautiful, with comfortable spacing "
+            f"and clean typography. {self._theme_instructions(theme, css_limit)} "
+            "Output ONLY raw CSS. Do NOT include <style> tags or markdown code blocks. Shorter is better."
+        )
+        payload = {
+            "model": "mistralai/ministral-3-3b",
+            "system_prompt": prompt,
+            "input": "Generate the stylesheet.",
+            "temperature": 0.3,
+            "stream": False
+        }
+        try:
+            css = self._strip_code_fence(self._complete(payload), 'css')
+        except Exception as e:
+            logger.warning("Stylesheet generation failed, using the default stylesheet: %s", e)
+            css = ""
+        if not css:
+            background, color = ('#1a1a1a', '#e0e0e0') if theme == 'dark' else ('#ffffff', '#222222')
+            css = (
+                f"body {{ background: {background}; color: {color}; font-family: Inter, sans-serif; "
+                "line-height: 1.6; max-width: 800px; margin: 0 auto; padding: 20px; }"
+            )
+        return css
+
+    def _generate_html_chunked(self, chunks: List[TextChunk], theme: str, css_limit: int = None) -> Tuple[str, int]:
+        prompt = (
+            "Convert the provided text into clean, semantically correct HTML5 body content. "
+            "Use appropriate tags (h1, h2, p, ul, li, table, etc.). "
+            "Output ONLY the elements that belong inside <body>. Do NOT output <html>, <head>, <body> or <style> tags, "
+            "do NOT add CSS or inline styles, and do NOT wrap in markdown code blocks."
+        )
+
+        def convert_chunk(index: int, chunk: TextChunk) -> Tuple[str, bool]:
+            payload = {
+                "model": "mistralai/ministral-3-3b",
+                "system_prompt": prompt,
+                "input": self._chunk_input(chunk, "Text to convert"),
+                "temperature": 0.3,
+                "stream": False
+            }
+            try:
+                body = self._strip_code_fence(self._complete(payload), 'html')
+            except Exception as e:
+                logger.warning("HTML conversion failed for chunk %d/%d, using plain paragraphs: %s", index + 1, len(chunks), e)
+                return self._fallback_html_body(chunk.text), True
+            if not body:
+                logger.warning("HTML conversion returned nothing for chunk %d/%d, using plain paragraphs", index + 1, len(chunks))
+                return self._fallback_html_body(chunk.text), True
+            return body, False
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            stylesheet = executor.submit(self._generate_stylesheet, theme, css_limit)
+            bodies, failed = self._map_chunks(chunks, convert_chunk)
+            css = stylesheet.result()
+
+        body = "\n".join(bodies)
+        return (
+            "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+            f"<style>\n{css}\n</style>\n</head>\n<body>\n{body}\n</body>\n</html>"
+        ), failed
+
+    def _stream_content(self, lines: Iterator[str]) -> Iterator[str]:
+        for line in lines:
+            if not line.startswith("data: "):
+                continue
+            json_str = line[6:]
+            if json_str.strip() == "[DONE]":
+                break
+            try:
+                data = json.loads(json_str)
+            except json.JSONDecodeError:
+                continue
+
+            content = ""
+            if "choices" in data:
+                delta = data["choices"][0].get("delta", {})
+                content = delta.get("content", "")
+
+            if not content and "content" in data:
+                content = data["content"]
+
+            if content:
+                yield content
+
+    def generate_from_image(
+        self,
+        image: Union[str, bytes],
+        prompt: str = None,
+        mime_type: str = None,
+        on_token: Callable[[str], None] = None,
+        max_tokens: int = None,
+        max_seconds: float = None
+    ) -> str:
         if not prompt:
             prompt = "Transcribe the text from this image exactly as it appears."
 
         try:
-            with open(image_path, "rb") as image_file:
-                base64_image = base64.b64encode(image_file.read()).decode('utf-8')
+            if isinstance(image, (bytes, bytearray, memoryview)):
+                image_data = image
+            else:
+                if not mime_type:
+                    mime_type, _ = mimetypes.guess_type(image)
+                with open(image, "rb") as image_file:
+                    image_data = image_file.read()
+            data_url = f"data:{mime_type or 'image/png'};base64," + base64.b64encode(image_data).decode('ascii')
 
             # Enhanced prompt for structure
             full_prompt = (
@@ -134,20 +307,28 @@ class LLMService:
                     },
                     {
                         "type": "image",
-                        "data_url": f"data:image/jpeg;base64,{base64_image}"
+                        "data_url": data_url
                     }
                 ],
                 "temperature": 0.1,
-                "stream": False
+                "stream": True
             }
 
-            result = self._send_request(payload)
-            if 'output' in result and len(result['output']) > 0:
-                for item in result['output']:
-                    if item.get('type') == 'message':
-                        return item['content'].strip()
-            return ""
+            parts = []
+            started = time.monotonic()
+            with closing(self.client.stream_lines(self.api_url, payload)) as lines:
+                for content in self._stream_content(lines):
+                    parts.append(content)
+                    if on_token:
+                        on_token(content)
+                    if max_tokens and len(parts) >= max_tokens:
+                        raise GenerationLimitError("".join(parts).strip(), f"exceeded {max_tokens} tokens")
+                    if max_seconds and time.monotonic() - started > max_seconds:
+                        raise GenerationLimitError("".join(parts).strip(), f"exceeded {max_seconds:g} seconds")
+            return "".join(parts).strip()
 
+        except GenerationLimitError:
+            raise
         except Exception as e:
             print(f"LLM Image generation failed: {str(e)}")
             raise e
@@ -192,34 +373,9 @@ class LLMService:
             payload["previous_response_id"] = previous_response_id
 
         try:
-            with requests.post(self.api_url, json=payload, stream=True, timeout=1800) as response:
-                response.raise_for_status()
-                
-                for line in response.iter_lines():
-                    if line:
-                        line = line.decode('utf-8')
-                        if line.startswith("data: "):
-                            json_str = line[6:]
-                            if json_str.strip() == "[DONE]":
-                                break
-                            try:
-                                data = json.loads(json_str)
-\
-                                
-                                content = ""
-                                if "choices" in data:
-                                    delta = data["choices"][0].get("delta", {})
-                                    content = delta.get("content", "")
-                                    
-                                if not content and "content" in data:
-                                    content = data["content"]
-                                    
-                                if content:
-                                    yield content
-                                    
-                            except json.JSONDecodeError:
-                                pass
-                                
+            for content in self._stream_content(self.client.stream_lines(self.api_url, payload)):
+                yield content
+
         except Exception as e:
             yield f"Error: {str(e)}"
 
@@ -0,0 +1,31 @@
+import hashlib
+import json
+from typing import Dict, Any
+
+from ..config import Config
+from ..utils.disk_cache import DiskLRUCache
+
+
+CACHE_VERSION = 2
+HASHED_KEYS = ('system_prompt', 'input')
+IGNORED_KEYS = ('stream',)
+
+
+def is_cacheable(payload: Dict[str, Any]) -> bool:
+    return payload.get('temperature') == 0
+
+
+def llm_cache_key(payload: Dict[str, Any]) -> str:
+    key = {
+        'version': CACHE_VERSION,
+        'prompt': hashlib.sha256(payload.get('system_prompt', '').encode('utf-8')).hexdigest(),
+        'input': hashlib.sha256(payload.get('input', '').encode('utf-8')).hexdigest(),
+        'params': {
+            name: value for name, value in payload.items()
+            if name not in HASHED_KEYS and name not in IGNORED_KEYS
+        }
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+llm_cache = DiskLRUCache(Config.LLM_CACHE_FOLDER, Config.LLM_CACHE_MAX_MB * 1024 * 1024)
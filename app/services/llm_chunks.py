@@ -0,0 +1,83 @@
+import re
+from typing import List, NamedTuple, Tuple
+
+
+PARAGRAPH_RE = re.compile(r'(\n[ \t]*\n|\f)')
+
+
+class TextChunk(NamedTuple):
+    text: str
+    context: str
+    separator: str = ''
+
+
+def _paragraphs(text: str) -> List[Tuple[str, str]]:
+    paragraphs = []
+    separator = ''
+    parts = PARAGRAPH_RE.split(text)
+    for i, part in enumerate(parts):
+        if i % 2:
+            separator += part
+        elif part.strip():
+            paragraphs.append((separator, part))
+            separator = ''
+        else:
+            separator += part
+    return paragraphs
+
+
+def _split_long(paragraph: str, max_chars: int) -> List[Tuple[str, str]]:
+    pieces = []
+    current = None
+    separator = ''
+    for line in paragraph.split('\n'):
+        if current is not None and (len(line) > max_chars or len(current) + len(line) + 1 > max_chars):
+            if current.strip():
+                pieces.append((separator, current))
+                separator = '\n'
+            else:
+                separator += current + '\n'
+            current = None
+        while len(line) > max_chars:
+            cut = line.rfind(' ', 0, max_chars)
+            if cut <= 0 or not line[:cut].strip():
+                cut = max_chars
+            pieces.append((separator, line[:cut]))
+            rest = line[cut:]
+            line = rest.lstrip()
+            separator = rest[:len(rest) - len(line)]
+        current = line if current is None else f"{current}\n{line}"
+    if current and current.strip():
+        pieces.append((separator, current))
+    return pieces
+
+
+def _tail(text: str, overlap_chars: int) -> str:
+    if len(text) <= overlap_chars:
+        return text
+    tail = text[-overlap_chars:]
+    space = tail.find(' ')
+    return tail[space + 1:] if 0 <= space < len(tail) - 1 else tail
+
+
+def chunk_text(text: str, max_chars: int, overlap_chars: int = 0) -> List[TextChunk]:
+    pieces = []
+    for separator, paragraph in _paragraphs(text):
+        if len(paragraph) > max_chars:
+            split = _split_long(paragraph, max_chars)
+            pieces.append((separator + split[0][0], split[0][1]))
+            pieces.extend(split[1:])
+        else:
+            pieces.append((separator, paragraph))
+
+    groups = []
+    for separator, piece in pieces:
+        if groups and len(groups[-1][1]) + len(separator) + len(piece) <= max_chars:
+            groups[-1][1] += separator + piece
+        else:
+            groups.append([separator, piece])
+
+    return [
+        TextChunk(group, _tail(groups[i - 1][1], overlap_chars) if i and overlap_chars else '', separator)
+        for i, (separator, group) in enumerate(groups)
+    ]
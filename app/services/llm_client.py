@@ -0,0 +1,213 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..config import Config
+from ..utils.exceptions import LLMUnavailableError
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+
+class _TransientStatusError(Exception):
+    pass
+
+
+class LLMClient:
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        pool_size: int = 8,
+        max_concurrency: int = 4,
+        model_concurrency: Optional[Dict[str, int]] = None,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 1800.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0
+    ):
+        self.max_concurrency = max_concurrency
+        self.model_concurrency = model_concurrency or {}
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = (connect_timeout, read_timeout)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._semaphores = {}
+        self._breakers = {}
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, model: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if model not in self._semaphores:
+                limit = self.model_concurrency.get(model, self.max_concurrency)
+                self._semaphores[model] = threading.BoundedSemaphore(max(1, limit))
+            return self._semaphores[model]
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        with self._lock:
+            if url not in self._breakers:
+                self._breakers[url] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self._breakers[url]
+
+    def _record(self, model: str, latency: Optional[float] = None, error: bool = False, retry: bool = False) -> None:
+        with self._lock:
+            metrics = self._metrics.setdefault(model, {
+                'requests': 0,
+                'errors': 0,
+                'retries': 0,
+                'total_latency': 0.0,
+                'max_latency': 0.0
+            })
+            if retry:
+                metrics['retries'] += 1
+                return
+            metrics['requests'] += 1
+            if error:
+                metrics['errors'] += 1
+            elif latency is not None:
+                metrics['total_latency'] += latency
+                metrics['max_latency'] = max(metrics['max_latency'], latency)
+
+    def _sleep_before_retry(self, attempt: int) -> None:
+        time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+
+    @contextmanager
+    def _request(self, url: str, payload: Dict[str, Any], stream: bool = False) -> Iterator[requests.Response]:
+        model = payload.get('model', 'default')
+        breaker = self.breaker(url)
+
+        with self._semaphore(model):
+            attempt = 0
+            while True:
+                if not breaker.allow():
+                    self._record(model, error=True)
+                    raise LLMUnavailableError(f"LLM server at {url} is unavailable")
+
+                start = time.monotonic()
+                try:
+                    response = self.session.post(url, json=payload, timeout=self.timeout, stream=stream)
+                    if response.status_code in self.RETRY_STATUS:
+                        response.close()
+                        raise _TransientStatusError(f"{response.status_code} from {url}")
+                except requests.ReadTimeout:
+                    breaker.record_failure()
+                    self._record(model, error=True)
+                    raise LLMUnavailableError(f"no response from {url} within {self.timeout[1]:g}s")
+                except (requests.ConnectionError, _TransientStatusError) as e:
+                    breaker.record_failure()
+                    if attempt >= self.max_retries:
+                        self._record(model, error=True)
+                        raise LLMUnavailableError(str(e))
+                    self._record(model, retry=True)
+                    self._sleep_before_retry(attempt)
+                    attempt += 1
+                    continue
+                except Exception:
+                    breaker.record_failure()
+                    self._record(model, error=True)
+                    raise
+
+                breaker.record_success()
+                try:
+                    response.raise_for_status()
+                    yield response
+                except Exception:
+                    self._record(model, error=True)
+                    raise
+                else:
+                    self._record(model, latency=time.monotonic() - start)
+                finally:
+                    response.close()
+                return
+
+    def post_json(self, url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with self._request(url, payload) as response:
+            return response.json()
+
+    def stream_lines(self, url: str, payload: Dict[str, Any]) -> Iterator[str]:
+        with self._request(url, payload, stream=True) as response:
+            for line in response.iter_lines():
+                if line:
+                    yield line.decode('utf-8')
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = {}
+            for model, metrics in self._metrics.items():
+                succeeded = metrics['requests'] - metrics['errors']
+                models[model] = {
+                    'requests': metrics['requests'],
+                    'errors': metrics['errors'],
+                    'retries': metrics['retries'],
+                    'error_rate': metrics['errors'] / metrics['requests'] if metrics['requests'] else 0.0,
+                    'avg_latency_ms': round(metrics['total_latency'] / succeeded * 1000, 1) if succeeded else 0.0,
+                    'max_latency_ms': round(metrics['max_latency'] * 1000, 1)
+                }
+            breakers = {url: breaker.state for url, breaker in self._breakers.items()}
+        return {'models': models, 'circuits': breakers}
+
+
+llm_client = LLMClient(
+    pool_size=Config.LLM_POOL_SIZE,
+    max_concurrency=Config.LLM_MAX_CONCURRENCY,
+    max_retries=Config.LLM_MAX_RETRIES,
+    connect_timeout=Config.LLM_CONNECT_TIMEOUT,
+    read_timeout=Config.LLM_READ_TIMEOUT,
+    failure_threshold=Config.LLM_BREAKER_THRESHOLD,
+    reset_timeout=Config.LLM_BREAKER_RESET_SECONDS
+)
@@ -0,0 +1,125 @@
+import queue
+from contextlib import contextmanager
+from typing import Any, Iterator, NamedTuple
+
+
+MARKDOWN_EXTENSIONS = ['tables', 'fenced_code', 'codehilite', 'toc']
+
+DEFAULT_STYLESHEET = '''
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+    line-height: 1.6;
+    max-width: 800px;
+    margin: 0 auto;
+    padding: 20px;
+    color: #333;
+}
+h1, h2, h3, h4, h5, h6 {
+    margin-top: 1.5em;
+    margin-bottom: 0.5em;
+    color: #1a1a1a;
+}
+code {
+    background: #f4f4f4;
+    padding: 2px 6px;
+    border-radius: 3px;
+    font-family: 'Consolas', 'Monaco', monospace;
+}
+pre {
+    background: #f4f4f4;
+    padding: 15px;
+    border-radius: 5px;
+    overflow-x: auto;
+}
+pre code {
+    background: none;
+    padding: 0;
+}
+blockquote {
+    border-left: 4px solid #ddd;
+    margin: 0;
+    padding-left: 20px;
+    color: #666;
+}
+table {
+    border-collapse: collapse;
+    width: 100%;
+}
+th, td {
+    border: 1px solid #ddd;
+    padding: 8px 12px;
+    text-align: left;
+}
+th {
+    background: #f4f4f4;
+}
+a {
+    color: #0066cc;
+}
+'''
+
+HTML_TEMPLATE = '''<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+</head>
+<body>
+{body}
+</body>
+</html>
+'''
+
+
+class RenderContext(NamedTuple):
+    markdown: Any
+    stylesheet: Any
+    font_config: Any
+
+
+class MarkdownPDFRenderer:
+    def __init__(self, stylesheet: str = DEFAULT_STYLESHEET):
+        self._stylesheet_source = stylesheet
+        self._idle = queue.LifoQueue()
+
+    def _create_context(self) -> RenderContext:
+        import markdown
+        from weasyprint import CSS
+        from weasyprint.text.fonts import FontConfiguration
+
+        font_config = FontConfiguration()
+        return RenderContext(
+            markdown.Markdown(extensions=MARKDOWN_EXTENSIONS),
+            CSS(string=self._stylesheet_source, font_config=font_config),
+            font_config
+        )
+
+    def warm_up(self) -> None:
+        if self._idle.empty():
+            self._idle.put(self._create_context())
+
+    @contextmanager
+    def _context(self) -> Iterator[RenderContext]:
+        try:
+            context = self._idle.get_nowait()
+        except queue.Empty:
+            context = self._create_context()
+        try:
+            yield context
+        finally:
+            context.markdown.reset()
+            self._idle.put(context)
+
+    def render(self, md_content: str, output_path: str) -> str:
+        from weasyprint import HTML
+
+        with self._context() as context:
+            full_html = HTML_TEMPLATE.format(body=context.markdown.convert(md_content))
+            HTML(string=full_html).write_pdf(
+                output_path,
+                stylesheets=[context.stylesheet],
+                font_config=context.font_config
+            )
+        return output_path
+
+
+markdown_pdf_renderer = MarkdownPDFRenderer()
@@ -1,32 +1,58 @@
-import os
-import shutil
-import tempfile
-import gc
+import logging
+import queue
+import threading
+import html
+import mimetypes
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from functools import partial
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union, Tuple, Callable, Iterator
 from .converter import BaseConverter
-from ..utils.exceptions import OCRError
+from ..config import Config
+from ..utils.exceptions import OCRError, GenerationLimitError
 from .llm import LLMService
+from .ocr_cache import ocr_cache, ocr_cache_key
+from .ocr_quality import garbage_ratio
+from .ocr_output import TextPageAppender, SearchablePDFWriter, PageTokenStream
+from .pdf_text import open_pdf
+
+logger = logging.getLogger(__name__)
 
 class OCRService(BaseConverter):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    TEXT_LAYER_MIN_CHARS = 50
+    TEXT_LAYER_MAX_GARBAGE_RATIO = 0.1
+    ENGINE_CONCURRENCY = {'qwen': 4, 'lighton': 4, 'lighton_mistral': 4, 'auto': 4}
+    AUTO_MIN_QUALITY = 0.6
+
+    def __init__(self, progress_callback: Optional[Callable[[int], None]] = None, page_callback: Optional[Callable[[int, str], None]] = None, checkpoint=None, token_callback: Optional[Callable[[int, str], None]] = None):
+        super().__init__(progress_callback)
+        self.page_callback = page_callback
+        self.checkpoint = checkpoint
+        self.token_callback = token_callback
         self.llm = LLMService()
+        self.metrics = {}
+        self._metrics_lock = threading.Lock()
+
+    @staticmethod
+    def _load_image(image: Union[str, bytes], mime_type: Optional[str] = None) -> Tuple[bytes, str]:
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            return bytes(image), mime_type or 'image/png'
+        if not mime_type:
+            mime_type, _ = mimetypes.guess_type(image)
+        with open(image, 'rb') as image_file:
+            return image_file.read(), mime_type or 'image/png'
 
-    def _extract_text(self, image_path: str, output_format: str = 'txt', use_llm: bool = False, engine: str = 'qwen', options: Dict[str, Any] = None) -> str:
+    def _extract_text(self, image: Union[str, bytes], output_format: str = 'txt', use_llm: bool = False, engine: str = 'qwen', options: Dict[str, Any] = None, mime_type: Optional[str] = None, max_new_tokens: Optional[int] = None, on_token: Optional[Callable[[str], None]] = None) -> str:
         options = options or {}
         try:
+            image_data, mime_type = self._load_image(image, mime_type)
+            
             if engine in ['lighton', 'lighton_mistral']:
-                text = self._extract_text_local(image_path)
+                text = self._extract_text_local(image_data, max_new_tokens)
                 
                 if engine == 'lighton_mistral':
-                    self.report_progress(50)
-                    text = self.llm.correct_text(text, output_format)
-                    
-                    if output_format == 'html':
-                        theme = options.get('ocr_theme', 'light')
-                        css_limit = options.get('css_limit_value') if options.get('css_limit_enabled') else None
-                        return self.llm.generate_html(text, theme, css_limit)
+                    return self._correct_local_text(text, output_format, options)
                         
                 return text
 
@@ -70,82 +96,97 @@ class OCRService(BaseConverter):
                     "Maintain the original layout using spaces and newlines where possible."
                 )
             
-            text = self.llm.generate_from_image(image_path, prompt)
+            try:
+                text = self.llm.generate_from_image(
+                    image_data, prompt, mime_type=mime_type, on_token=on_token,
+                    max_tokens=options.get('ocr_max_page_tokens', Config.OCR_PAGE_MAX_TOKENS),
+                    max_seconds=options.get('ocr_max_page_seconds', Config.OCR_PAGE_MAX_SECONDS)
+                )
+            except GenerationLimitError as e:
+                e.partial_text = self._clean_generated(e.partial_text, output_format)
+                raise
             
-            if output_format == 'html':
-                if text.startswith("```html"): text = text[7:]
-                if text.startswith("```"): text = text[3:]
-                if text.endswith("```"): text = text[:-3]
-                return text.strip()
-
-            if output_format == 'md':
-                if text.startswith("```markdown"): text = text[11:]
-                elif text.startswith("```md"): text = text[5:]
-                elif text.startswith("```"): text = text[3:]
-                if text.endswith("```"): text = text[:-3]
-                return text.strip()
-                
-            return text
+            return self._clean_generated(text, output_format)
 
+        except GenerationLimitError:
+            raise
         except Exception as e:
             raise OCRError(str(e))
 
-    def _extract_text_local(self, image_path: str) -> str:
-        try:
-            import torch
-            from transformers import LightOnOcrForConditionalGeneration, LightOnOcrProcessor
+    def _clean_generated(self, text: str, output_format: str) -> str:
+        if output_format == 'html':
+            if text.startswith("```html"): text = text[7:]
+            if text.startswith("```"): text = text[3:]
+            if text.endswith("```"): text = text[:-3]
+            return text.strip()
 
-            if not hasattr(self, '_lighton_model'):
-                device = "mps" if torch.backends.mps.is_available() else "cuda" if torch.cuda.is_available() else "cpu"
-                dtype = torch.float32 if device == "mps" else torch.bfloat16
-                
-                if device == 'cpu':
-                    dtype = torch.float32
-
-                self._lighton_device = device
-                self._lighton_dtype = dtype
-                self._lighton_model = LightOnOcrForConditionalGeneration.from_pretrained(
-                    "lightonai/LightOnOCR-2-1B-base", 
-                    torch_dtype=dtype
-                ).to(device)
-                self._lighton_processor = LightOnOcrProcessor.from_pretrained("lightonai/LightOnOCR-2-1B-base")
-
-            import base64
-            import mimetypes
-            
-            mime_type, _ = mimetypes.guess_type(image_path)
-            if not mime_type:
-                mime_type = 'image/png'
+        if output_format == 'md':
+            if text.startswith("```markdown"): text = text[11:]
+            elif text.startswith("```md"): text = text[5:]
+            elif text.startswith("```"): text = text[3:]
+            if text.endswith("```"): text = text[:-3]
+            return text.strip()
             
-            with open(image_path, "rb") as image_file:
-                encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-            
-            image_url = f"data:{mime_type};base64,{encoded_string}"
-            
-            conversation = [{"role": "user", "content": [{"type": "image", "url": image_url}]}]
-
-            inputs = self._lighton_processor.apply_chat_template(
-                conversation,
-                add_generation_prompt=True,
-                tokenize=True,
-                return_dict=True,
-                return_tensors="pt",
-            )
-            
-            inputs = {
-                k: v.to(device=self._lighton_device, dtype=self._lighton_dtype) 
-                if v.is_floating_point() else v.to(self._lighton_device) 
-                for k, v in inputs.items()
-            }
+        return text
 
-            output_ids = self._lighton_model.generate(**inputs, max_new_tokens=1024)
-            generated_ids = output_ids[0, inputs["input_ids"].shape[1]:]
-            output_text = self._lighton_processor.decode(generated_ids, skip_special_tokens=True)
-            
-            return output_text
+    def _count_failed_chunks(self, failed: int) -> None:
+        if failed:
+            with self._metrics_lock:
+                self.metrics['failed_chunks'] = self.metrics.get('failed_chunks', 0) + failed
+
+    def _correct_local_text(self, text: str, output_format: str, options: Dict[str, Any]) -> str:
+        text, failed = self.llm.correct_text(text, output_format)
+        self._count_failed_chunks(failed)
+        
+        if output_format == 'html':
+            theme = options.get('ocr_theme', 'light')
+            css_limit = options.get('css_limit_value') if options.get('css_limit_enabled') else None
+            text, failed = self.llm.generate_html(text, theme, css_limit)
+            self._count_failed_chunks(failed)
+        
+        return text
+
+    def _extract_text_auto(self, image_data: bytes, output_format: str, options: Dict[str, Any], mime_type: Optional[str] = None, max_new_tokens: Optional[int] = None, on_token: Optional[Callable[[str], None]] = None) -> Tuple[str, str]:
+        from .ocr_quality import text_quality
+        
+        try:
+            text = self._extract_text(image_data, output_format, engine='lighton', options=options, mime_type=mime_type, max_new_tokens=max_new_tokens)
+        except OCRError as e:
+            logger.warning("LightOn OCR failed, escalating to qwen: %s", e.message)
+            text = None
+
+        if text is not None and text_quality(text) >= options.get('ocr_auto_min_quality', self.AUTO_MIN_QUALITY):
+            return text, 'lighton'
 
+        fallback = options.get('ocr_auto_fallback', 'qwen') if text is not None else 'qwen'
+        try:
+            if fallback == 'lighton_mistral':
+                return self._correct_local_text(text, output_format, options), fallback
+            return self._extract_text(image_data, output_format, engine='qwen', options=options, mime_type=mime_type, on_token=on_token), 'qwen'
+        except GenerationLimitError:
+            raise
         except Exception as e:
-            raise e
+            raise OCRError(str(e))
+
+    def _recognize(self, image_data: bytes, mime_type: str, output_format: str, engine: str, options: Dict[str, Any], max_new_tokens: Optional[int], stream: PageTokenStream) -> Tuple[str, str, bool]:
+        try:
+            if engine == 'auto':
+                text, used_engine = self._extract_text_auto(image_data, output_format, options, mime_type, max_new_tokens, on_token=stream)
+            else:
+                text = self._extract_text(image_data, output_format, use_llm=options.get('use_llm', False), engine=engine, options=options, mime_type=mime_type, max_new_tokens=max_new_tokens, on_token=stream)
+                used_engine = engine
+            return text, used_engine, False
+        except GenerationLimitError as e:
+            used_engine = 'qwen' if engine == 'auto' else engine
+            logger.warning("OCR page %d truncated by %s: %s", stream.page, used_engine, e.message)
+            return e.partial_text, used_engine, True
+        finally:
+            stream.flush()
+
+    def _extract_text_local(self, image_data: bytes, max_new_tokens: Optional[int] = None) -> str:
+        from .lighton_server import lighton_server, DEFAULT_MAX_NEW_TOKENS
+
+        return lighton_server.recognize(image_data, max_new_tokens or DEFAULT_MAX_NEW_TOKENS)
 
     @staticmethod
     def get_supported_input_formats() -> set:
@@ -188,20 +229,43 @@ class OCRService(BaseConverter):
                 doc.add_paragraph(line)
         doc.save(output_path)
 
-    def _save_as_pdf(self, text: str, output_path: str):
+    def _save_as_pdf(self, image_path: str, text: str, output_path: str):
         import fitz
+        from .pdf_assembler import PDFAssembler
+        
         doc = fitz.open()
-        page = doc.new_page()
-        p = fitz.Point(50, 72)
-        page.insert_text(p, text, fontsize=11)
-        doc.save(output_path)
-        doc.close()
+        try:
+            PDFAssembler().append_image(doc, image_path)
+            pdf_data = doc.tobytes()
+        finally:
+            doc.close()
+        
+        writer = SearchablePDFWriter(pdf_data, output_path)
+        writer.add(0, text)
+        writer.close()
 
     def ocr_image(self, input_path: str, output_path: str, output_format: str, options: Dict[str, Any]) -> str:
         try:
             self.report_progress(10)
             engine = options.get('ocr_engine', 'qwen')
-            text = self._extract_text(input_path, output_format, use_llm=options.get('use_llm', False), engine=engine, options=options)
+            image_data, mime_type = self._load_image(input_path)
+            cache_key = self._cache_key(image_data, output_format, engine, options)
+            text = ocr_cache.get(cache_key) if cache_key else None
+            self.metrics = {'cache_hits': int(text is not None), 'truncated_pages': 0, 'failed_chunks': 0, 'page_engines': ['cache']}
+            if text is None:
+                from .ocr_pages import image_token_budget
+                
+                stream = PageTokenStream(
+                    1, image_token_budget(image_data), self.token_callback,
+                    lambda page, fraction: self.report_progress(10 + int(fraction * 80))
+                )
+                text, used_engine, truncated = self._recognize(image_data, mime_type, output_format, engine, options, None, stream)
+                self.metrics['page_engines'] = [used_engine]
+                self.metrics['truncated_pages'] = int(truncated)
+                if cache_key and text and not truncated:
+                    ocr_cache.set(cache_key, text)
+            if self.page_callback and text:
+                self.page_callback(1, text)
             self.report_progress(90)
             
             if self.is_cancelled:
@@ -210,7 +274,7 @@ class OCRService(BaseConverter):
             if output_format == 'docx':
                 self._save_as_docx(text, output_path)
             elif output_format == 'pdf':
-                self._save_as_pdf(text, output_path)
+                self._save_as_pdf(input_path, text, output_path)
             else:
                 with open(output_path, 'w', encoding='utf-8') as f:
                     f.write(text)
@@ -221,51 +285,263 @@ class OCRService(BaseConverter):
         except Exception as e:
             raise OCRError(str(e))
 
-    def ocr_pdf(self, input_path: str, output_path: str, output_format: str, options: Dict[str, Any]) -> str:
-        import fitz
+    def _is_garbled(self, text: str) -> bool:
+        return garbage_ratio(text) > self.TEXT_LAYER_MAX_GARBAGE_RATIO
+
+    def _usable_text_layer(self, page, options: Dict[str, Any]) -> Optional[str]:
+        if options.get('ocr_mode', 'hybrid') == 'force':
+            return None
+        text = page.get_text()
+        if len(text.strip()) < self.TEXT_LAYER_MIN_CHARS or self._is_garbled(text):
+            return None
+        return text
+
+    def _format_text_layer(self, text: str, output_format: str) -> str:
+        if output_format == 'html':
+            return '\n'.join(
+                f"<p>{html.escape(line.strip())}</p>" for line in text.split('\n') if line.strip()
+            )
+        return text.strip()
+
+    def _concurrency(self, engine: str, options: Dict[str, Any]) -> int:
+        limit = options.get('ocr_concurrency') or self.ENGINE_CONCURRENCY.get(engine, 1)
+        return max(1, int(limit))
+
+    def _find_duplicate(self, page_image: Dict[str, Any], seen_pages: list, options: Dict[str, Any]) -> Optional[int]:
+        from .ocr_pages import is_near_duplicate
+
+        if page_image['blank'] or not options.get('ocr_dedupe', True):
+            return None
+        for index, seen in seen_pages:
+            if is_near_duplicate(seen, page_image):
+                return index
+        return None
+
+    def _classify_pages(self, doc, output_format: str, engine: str, options: Dict[str, Any],
+                        restored: Dict[int, str]) -> Iterator[Tuple[int, str, Any]]:
+        from .ocr_pages import render_page_image, DUPLICATE_WINDOW
+
+        seen_pages = deque(maxlen=DUPLICATE_WINDOW)
+        for i, page in enumerate(doc):
+            if i in restored:
+                yield i, 'restored', restored[i]
+                continue
+
+            text_layer = self._usable_text_layer(page, options)
+            if text_layer is not None:
+                yield i, 'text', self._format_text_layer(text_layer, output_format)
+                continue
+
+            page_image = render_page_image(page, engine, options)
+            duplicate_of = self._find_duplicate(page_image, seen_pages, options)
+            if page_image['blank']:
+                yield i, 'blank', ''
+            elif duplicate_of is not None:
+                yield i, 'duplicate', duplicate_of
+            else:
+                seen_pages.append((i, {'phash': page_image['phash'], 'thumbnail': page_image['thumbnail']}))
+                yield i, 'image', page_image
+
+    def _cache_key(self, image_data: bytes, output_format: str, engine: str, options: Dict[str, Any]) -> Optional[str]:
+        if not options.get('ocr_cache', True):
+            return None
+        return ocr_cache_key(image_data, engine, output_format, options)
+
+    def _ocr_page(self, index: int, page_image: Dict[str, Any], output_format: str, engine: str, options: Dict[str, Any], cache_key: Optional[str] = None, on_progress: Optional[Callable[[int, float], None]] = None) -> Tuple[str, bool]:
+        from .ocr_pages import token_budget
+
+        max_new_tokens = token_budget(page_image['ink_coverage'])
+        stream = PageTokenStream(index + 1, max_new_tokens, self.token_callback, on_progress)
+        text, used_engine, truncated = self._recognize(page_image['data'], page_image['mime_type'], output_format, engine, options, max_new_tokens, stream)
+        self.metrics['page_engines'][index] = used_engine
+        if truncated:
+            with self._metrics_lock:
+                self.metrics['truncated_pages'] += 1
+        elif cache_key and text:
+            ocr_cache.set(cache_key, text)
+        return text, truncated
+
+    def ocr_pdf_to_searchable(self, source: Union[str, bytes], output_path: str, options: Dict[str, Any]) -> str:
+        return self.ocr_pdf(source, output_path, 'pdf', options)
+
+    def ocr_pdf(self, input_path: Union[str, bytes], output_path: str, output_format: str, options: Dict[str, Any]) -> str:
+        engine = options.get('ocr_engine', 'qwen')
+        concurrency = self._concurrency(engine, options)
         
-        temp_dir = tempfile.mkdtemp(prefix="ocr_pdf_")
-        full_content = []
+        stop_event = threading.Event()
+        slots = threading.BoundedSemaphore(concurrency)
+        progress_lock = threading.Lock()
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='ocr')
+        finished = queue.Queue()
+        doc = None
+        sink = None
+        pages = {}
         
         try:
             self.report_progress(5)
-            doc = fitz.open(input_path)
+            doc = open_pdf(input_path, options.get('password'))
             total_pages = len(doc)
+            restored = self.checkpoint.completed_pages() if self.checkpoint else {}
+            self.metrics = {
+                'pages': total_pages,
+                'ocr_pages': 0,
+                'text_layer_pages': 0,
+                'blank_pages': 0,
+                'duplicate_pages': 0,
+                'cache_hits': 0,
+                'restored_pages': 0,
+                'escalated_pages': 0,
+                'truncated_pages': 0,
+                'failed_chunks': 0,
+                'page_engines': [None] * total_pages,
+                'payload_bytes': [0] * total_pages,
+                'payload_bytes_total': 0
+            }
+            completed = 0
+            in_flight = {}
+            reported = 0
+            
+            if output_format == 'pdf':
+                sink = SearchablePDFWriter(
+                    input_path, output_path, options.get('password'),
+                    has_text_layer=lambda page: self._usable_text_layer(page, {}) is not None
+                )
+            elif output_format != 'docx':
+                sink = TextPageAppender(output_path, "\n<hr>\n" if output_format == 'html' else "\n\n")
+            
+            def report_pages():
+                nonlocal reported
+                progress = 5 + int((completed + sum(in_flight.values())) / total_pages * 90)
+                if progress > reported:
+                    reported = progress
+                    self.report_progress(progress)
+            
+            def page_progress(page: int, fraction: float):
+                with progress_lock:
+                    if page - 1 not in in_flight:
+                        return
+                    in_flight[page - 1] = fraction
+                    report_pages()
+            
+            def page_done(index: int, content: str, save: bool = True):
+                nonlocal completed
+                if save and self.checkpoint:
+                    self.checkpoint.save_page(index, content)
+                with progress_lock:
+                    completed += 1
+                    in_flight.pop(index, None)
+                    if sink is not None:
+                        sink.add(index, content)
+                    report_pages()
+                if self.page_callback and content:
+                    self.page_callback(index + 1, content)
             
-            for i, page in enumerate(doc):
-                if self.is_cancelled:
-                    doc.close()
-                    return None
-                    
-                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-                page_path = os.path.join(temp_dir, f"page_{i}.png")
-                pix.save(page_path)
+            def ocr_done(index: int, future: Future):
+                if future.cancelled() or future.exception() is not None:
+                    stop_event.set()
+                else:
+                    finished.put((index, *future.result()))
+            
+            def drain(wait: bool = False):
+                while True:
+                    try:
+                        index, content, truncated = finished.get(timeout=0.1) if wait else finished.get_nowait()
+                    except queue.Empty:
+                        return
+                    page_done(index, content, save=not truncated)
+                    wait = False
+            
+            def wait_for_slot() -> bool:
+                while not slots.acquire(timeout=0.1):
+                    drain()
+                    if stop_event.is_set() or self.is_cancelled:
+                        return False
+                return True
+            
+            for index, kind, payload in self._classify_pages(doc, output_format, engine, options, restored):
+                drain()
+                if stop_event.is_set() or self.is_cancelled:
+                    break
                 
-                del pix
-                gc.collect()
+                if kind == 'restored':
+                    pages[index] = payload
+                    self.metrics['restored_pages'] += 1
+                    self.metrics['page_engines'][index] = 'checkpoint'
+                    page_done(index, payload, save=False)
+                    continue
                 
-                engine = options.get('ocr_engine', 'qwen')
-                content = self._extract_text(page_path, output_format, use_llm=options.get('use_llm', False), engine=engine, options=options)
-                full_content.append(content)
+                if kind == 'text':
+                    pages[index] = payload
+                    self.metrics['text_layer_pages'] += 1
+                    self.metrics['page_engines'][index] = 'text_layer'
+                    page_done(index, payload)
+                    continue
                 
-                self.report_progress(5 + int((i + 1) / total_pages * 90))
+                if kind == 'blank':
+                    pages[index] = payload
+                    self.metrics['blank_pages'] += 1
+                    self.metrics['page_engines'][index] = 'blank'
+                    page_done(index, payload)
+                    continue
                 
-            doc.close()
+                if kind == 'duplicate':
+                    source = pages[payload]
+                    pages[index] = source
+                    self.metrics['duplicate_pages'] += 1
+                    self.metrics['page_engines'][index] = 'duplicate'
+                    if isinstance(source, Future):
+                        source.add_done_callback(partial(ocr_done, index))
+                    else:
+                        page_done(index, source)
+                    continue
+                
+                cache_key = self._cache_key(payload['data'], output_format, engine, options)
+                cached = ocr_cache.get(cache_key) if cache_key else None
+                if cached is not None:
+                    pages[index] = cached
+                    self.metrics['cache_hits'] += 1
+                    self.metrics['page_engines'][index] = 'cache'
+                    page_done(index, cached)
+                    continue
+                
+                self.metrics['payload_bytes'][index] = len(payload['data'])
+                self.metrics['payload_bytes_total'] += len(payload['data'])
+                
+                if not wait_for_slot():
+                    break
+                with progress_lock:
+                    in_flight[index] = 0.0
+                future = executor.submit(self._ocr_page, index, payload, output_format, engine, options, cache_key, page_progress)
+                pages[index] = future
+                self.metrics['ocr_pages'] += 1
+                future.add_done_callback(lambda _: slots.release())
+                future.add_done_callback(partial(ocr_done, index))
+            
+            while completed < total_pages and not stop_event.is_set() and not self.is_cancelled:
+                drain(wait=True)
+            
+            if self.is_cancelled:
+                return None
+            
+            executor.shutdown(wait=True)
+            drain()
+            
+            full_content = []
+            for index in sorted(pages):
+                page = pages[index]
+                content = page.result()[0] if isinstance(page, Future) else page
+                if content:
+                    full_content.append(content)
+            
+            if engine == 'auto':
+                self.metrics['escalated_pages'] = sum(
+                    1 for used_engine in self.metrics['page_engines'] if used_engine in ('qwen', 'lighton_mistral')
+                )
             
             text_result = "\n\n".join(full_content)
 
             if output_format == 'docx':
                  self._save_as_docx(text_result, output_path)
-            elif output_format == 'pdf':
-                 self._save_as_pdf(text_result, output_path)
-            else:
-                if output_format == 'html':
-                    final_output = "\n<hr>\n".join(full_content)
-                else:
-                    final_output = text_result
-
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(final_output)
 
             self.report_progress(100)
             return output_path
@@ -273,4 +549,10 @@ class OCRService(BaseConverter):
         except Exception as e:
             raise OCRError(str(e))
         finally:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+            stop_event.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            if doc is not None:
+                doc.close()
+            if sink is not None:
+                with progress_lock:
+                    sink.close()
@@ -0,0 +1,25 @@
+import hashlib
+import json
+from typing import Dict, Any
+
+from ..config import Config
+from ..utils.disk_cache import DiskLRUCache
+
+
+CACHE_VERSION = 1
+PROMPT_OPTION_KEYS = ('ocr_theme', 'css_limit_enabled', 'css_limit_value')
+
+
+def ocr_cache_key(image_data: bytes, engine: str, output_format: str, options: Dict[str, Any]) -> str:
+    key = {
+        'version': CACHE_VERSION,
+        'image': hashlib.sha256(image_data).hexdigest(),
+        'engine': engine,
+        'format': output_format
+    }
+    if output_format == 'html':
+        key['options'] = {name: options.get(name) for name in PROMPT_OPTION_KEYS}
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+ocr_cache = DiskLRUCache(Config.OCR_CACHE_FOLDER, Config.OCR_CACHE_MAX_MB * 1024 * 1024)
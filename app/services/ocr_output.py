@@ -0,0 +1,183 @@
+import logging
+import os
+import shutil
+import time
+from abc import ABC, abstractmethod
+from typing import Optional, Union, Callable
+
+from .pdf_text import open_pdf
+
+logger = logging.getLogger(__name__)
+
+
+class PageTokenStream:
+    FLUSH_INTERVAL = 0.25
+
+    def __init__(
+        self,
+        page: int,
+        expected_tokens: int,
+        on_text: Optional[Callable[[int, str], None]] = None,
+        on_progress: Optional[Callable[[int, float], None]] = None
+    ):
+        self.page = page
+        self.expected_tokens = max(1, expected_tokens)
+        self.tokens = 0
+        self._on_text = on_text
+        self._on_progress = on_progress
+        self._buffer = []
+        self._last_flush = time.monotonic()
+
+    @property
+    def fraction(self) -> float:
+        return min(0.99, self.tokens / self.expected_tokens)
+
+    def __call__(self, content: str) -> None:
+        self.tokens += 1
+        self._buffer.append(content)
+        if time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if self._buffer and self._on_text:
+            self._on_text(self.page, ''.join(self._buffer))
+        self._buffer = []
+        if self._on_progress:
+            self._on_progress(self.page, self.fraction)
+
+
+class OrderedPageSink(ABC):
+    def __init__(self):
+        self._ready = {}
+        self._next = 0
+        self._closed = False
+
+    def add(self, index: int, content: str) -> None:
+        if self._closed:
+            return
+        self._ready[index] = content
+        while self._next in self._ready:
+            self._write(self._next, self._ready.pop(self._next))
+            self._next += 1
+        self._flush()
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._finish()
+
+    @abstractmethod
+    def _write(self, index: int, content: str) -> None:
+        pass
+
+    def _flush(self) -> None:
+        pass
+
+    def _finish(self) -> None:
+        pass
+
+
+class TextPageAppender(OrderedPageSink):
+    def __init__(self, output_path: str, separator: str):
+        super().__init__()
+        self._file = open(output_path, 'w', encoding='utf-8')
+        self._separator = separator
+        self._written = False
+
+    def _write(self, index: int, content: str) -> None:
+        if not content:
+            return
+        if self._written:
+            self._file.write(self._separator)
+        self._file.write(content)
+        self._written = True
+
+    def _flush(self) -> None:
+        self._file.flush()
+
+    def _finish(self) -> None:
+        self._file.close()
+
+
+class SearchablePDFWriter(OrderedPageSink):
+    FONT_SIZES = (11, 9, 7, 5, 4, 3)
+    MARGIN = 18
+    SAVE_EVERY_PAGES = 8
+
+    def __init__(
+        self,
+        source: Union[str, bytes],
+        output_path: str,
+        password: Optional[str] = None,
+        has_text_layer: Callable = lambda page: False
+    ):
+        import fitz
+
+        super().__init__()
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            with open(output_path, 'wb') as f:
+                f.write(source)
+        else:
+            shutil.copyfile(source, output_path)
+
+        self.output_path = output_path
+        self._has_text_layer = has_text_layer
+        self._doc = open_pdf(output_path, password)
+        self._font = fitz.Font('helv')
+        self._incremental = self._doc.can_save_incrementally()
+        self._pending = 0
+
+    def _overlay(self, page, text: str) -> None:
+        import fitz
+
+        rect = page.rect + (self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        for fontsize in self.FONT_SIZES:
+            writer = fitz.TextWriter(page.rect)
+            try:
+                overflow = writer.fill_textbox(rect, text, font=self._font, fontsize=fontsize)
+            except ValueError:
+                overflow = True
+            if not overflow:
+                writer.write_text(page, render_mode=3)
+                return
+        if overflow is True:
+            logger.warning("OCR text layer for page %d could not be placed", page.number + 1)
+            return
+        writer.write_text(page, render_mode=3)
+        logger.warning(
+            "OCR text layer for page %d overflows at %gpt, %d lines were left out",
+            page.number + 1, self.FONT_SIZES[-1], len(overflow)
+        )
+
+    def _write(self, index: int, content: str) -> None:
+        page = self._doc[index]
+        if content and content.strip() and not self._has_text_layer(page):
+            self._overlay(page, content)
+            self._pending += 1
+
+    def _save_incremental(self) -> None:
+        import fitz
+
+        self._doc.save(self.output_path, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP, deflate=True)
+        self._pending = 0
+
+    def _flush(self) -> None:
+        if self._incremental and self._pending >= self.SAVE_EVERY_PAGES:
+            self._save_incremental()
+
+    def _finish(self) -> None:
+        import fitz
+
+        try:
+            if self._incremental:
+                if self._pending:
+                    self._save_incremental()
+            else:
+                temp_path = f"{self.output_path}.tmp"
+                self._doc.save(temp_path, encryption=fitz.PDF_ENCRYPT_KEEP, deflate=True)
+                self._doc.close()
+                os.replace(temp_path, self.output_path)
+        finally:
+            if not self._doc.is_closed:
+                self._doc.close()
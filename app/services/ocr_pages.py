@@ -0,0 +1,160 @@
+import io
+from typing import Dict, Any
+
+import numpy as np
+from PIL import Image
+
+
+ENGINE_MAX_IMAGE_SIDE = {'qwen': 1792, 'lighton': 1540, 'lighton_mistral': 1540}
+REMOTE_ENGINES = {'qwen'}
+DEFAULT_MAX_IMAGE_SIDE = 1600
+MIN_ZOOM = 1.0
+MAX_ZOOM = 4.0
+
+GRAYSCALE_MAX_CHANNEL_SPREAD = 12
+GRAYSCALE_MAX_COLOR_PIXELS = 0.001
+LOSSY_MIN_PSNR = 38.0
+LOSSY_QUALITY = 85
+PAYLOAD_FORMATS = {'jpeg': ('JPEG', 'image/jpeg'), 'webp': ('WEBP', 'image/webp')}
+
+INK_CONTRAST = 0.65
+BLANK_MAX_INK_COVERAGE = 0.0002
+TEXT_ROW_MIN_INK = 2
+TEXT_ROW_MIN_HEIGHT = 5
+HASH_SIZE = 32
+DUPLICATE_MAX_DISTANCE = 32
+THUMBNAIL_SIDE = 512
+DUPLICATE_MAX_PIXEL_DIFF = 24
+DUPLICATE_WINDOW = 64
+
+MIN_NEW_TOKENS = 256
+MAX_NEW_TOKENS = 1536
+TOKENS_PER_INK_COVERAGE = 20000
+
+
+def page_zoom(page, engine: str, options: Dict[str, Any]) -> float:
+    max_side = options.get('ocr_max_image_side') or ENGINE_MAX_IMAGE_SIDE.get(engine, DEFAULT_MAX_IMAGE_SIDE)
+    longest = max(page.rect.width, page.rect.height) or 1
+    return min(MAX_ZOOM, max(MIN_ZOOM, max_side / longest))
+
+
+def token_budget(coverage: float) -> int:
+    return int(min(MAX_NEW_TOKENS, max(MIN_NEW_TOKENS, coverage * TOKENS_PER_INK_COVERAGE)))
+
+
+def image_token_budget(image_data: bytes) -> int:
+    with Image.open(io.BytesIO(image_data)) as image:
+        return token_budget(ink_coverage(np.asarray(image.convert('L'))))
+
+
+def is_grayscale(pixels: np.ndarray) -> bool:
+    if pixels.ndim == 2:
+        return True
+    spread = pixels.max(axis=2).astype(np.int16) - pixels.min(axis=2)
+    return np.count_nonzero(spread > GRAYSCALE_MAX_CHANNEL_SPREAD) <= spread.size * GRAYSCALE_MAX_COLOR_PIXELS
+
+
+def ink_mask(gray: np.ndarray) -> np.ndarray:
+    background = float(np.median(gray))
+    return gray < background * INK_CONTRAST
+
+
+def ink_coverage(gray: np.ndarray) -> float:
+    return float(np.count_nonzero(ink_mask(gray))) / gray.size
+
+
+def has_text_rows(mask: np.ndarray) -> bool:
+    inked_rows = (np.count_nonzero(mask, axis=1) >= TEXT_ROW_MIN_INK).astype(np.int8)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], inked_rows, [0]))))
+    runs = edges[1::2] - edges[::2]
+    return bool(runs.size) and int(runs.max()) >= TEXT_ROW_MIN_HEIGHT
+
+
+def is_blank(mask: np.ndarray) -> bool:
+    coverage = float(np.count_nonzero(mask)) / mask.size
+    return coverage < BLANK_MAX_INK_COVERAGE and not has_text_rows(mask)
+
+
+def perceptual_hash(image: Image.Image) -> int:
+    small = image.convert('L').resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BILINEAR)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hash_distance(first: int, second: int) -> int:
+    return bin(first ^ second).count('1')
+
+
+def page_thumbnail(image: Image.Image) -> np.ndarray:
+    thumbnail = image.convert('L')
+    thumbnail.thumbnail((THUMBNAIL_SIDE, THUMBNAIL_SIDE), Image.Resampling.BOX)
+    return np.asarray(thumbnail)
+
+
+def is_near_duplicate(first: Dict[str, Any], second: Dict[str, Any]) -> bool:
+    if hash_distance(first['phash'], second['phash']) > DUPLICATE_MAX_DISTANCE:
+        return False
+    if first['thumbnail'].shape != second['thumbnail'].shape:
+        return False
+    diff = np.abs(first['thumbnail'].astype(np.int16) - second['thumbnail'])
+    return int(diff.max()) <= DUPLICATE_MAX_PIXEL_DIFF
+
+
+def psnr(reference: np.ndarray, candidate: np.ndarray) -> float:
+    mse = np.mean((reference.astype(np.float32) - candidate.astype(np.float32)) ** 2)
+    if mse == 0:
+        return float('inf')
+    return 10 * np.log10(255.0 ** 2 / mse)
+
+
+def encode_page_image(image: Image.Image, payload_format: str = 'auto') -> Dict[str, Any]:
+    pixels = np.asarray(image)
+    if image.mode != 'L' and is_grayscale(pixels):
+        image = image.convert('L')
+        pixels = np.asarray(image)
+
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG', compress_level=6)
+    encoded = {'data': buffer.getvalue(), 'mime_type': 'image/png'}
+
+    if payload_format == 'png':
+        return encoded
+
+    lossy_format = payload_format if payload_format in PAYLOAD_FORMATS else 'jpeg'
+    pil_format, mime_type = PAYLOAD_FORMATS[lossy_format]
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, quality=LOSSY_QUALITY)
+    lossy = buffer.getvalue()
+
+    if len(lossy) >= len(encoded['data']):
+        return encoded
+
+    with Image.open(io.BytesIO(lossy)) as decoded:
+        if psnr(pixels, np.asarray(decoded.convert(image.mode))) < LOSSY_MIN_PSNR:
+            return encoded
+
+    return {'data': lossy, 'mime_type': mime_type}
+
+
+def render_page_image(page, engine: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    import fitz
+
+    zoom = page_zoom(page, engine, options)
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    image = Image.frombytes('RGB', (pix.width, pix.height), pix.samples)
+    del pix
+
+    mask = ink_mask(np.asarray(image.convert('L')))
+    coverage = float(np.count_nonzero(mask)) / mask.size
+    if options.get('ocr_skip_blank', True) and is_blank(mask):
+        return {'blank': True, 'ink_coverage': coverage}
+    del mask
+
+    payload_format = options.get('ocr_payload_format', 'auto') if engine in REMOTE_ENGINES else 'png'
+    page_image = encode_page_image(image, payload_format)
+    page_image['blank'] = False
+    page_image['ink_coverage'] = coverage
+    page_image['phash'] = perceptual_hash(image)
+    page_image['thumbnail'] = page_thumbnail(image)
+    return page_image
@@ -0,0 +1,81 @@
+import re
+import unicodedata
+
+
+COMMON_WORDS = frozenset('''
+a about above after again all also an and any are as at be because been before being below between both
+but by can could did do does doing down during each few for from further had has have having he her here
+hers him his how i if in into is it its itself just may me more most must my no nor not now of off on once
+only or other our out over own same she should so some such than that the their them then there these they
+this those through to too under until up upon very was we were what when where which while who whom why
+will with would you your page date name total number section table figure see use used using new one two
+three first second per year years time made make well within without however therefore including
+'''.split())
+
+WORD_RE = re.compile(r"[^\W\d_]+(?:['’-][^\W\d_]+)*")
+VOWELS = set('aeiouyàáâãäåæèéêëìíîïòóôõöøùúûüýÿąęóœ')
+
+MAX_GARBAGE_RATIO = 0.1
+DICTIONARY_TARGET_RATE = 0.25
+MAX_REPEATED_LINE_RATIO = 0.3
+MIN_VISIBLE_CHARS = 20
+
+
+def garbage_ratio(text: str) -> float:
+    visible = [c for c in text if not c.isspace()]
+    if not visible:
+        return 1.0
+    garbage = sum(
+        1 for c in visible
+        if c == '\ufffd' or unicodedata.category(c) in ('Cc', 'Co', 'Cs', 'Cn')
+    )
+    return garbage / len(visible)
+
+
+def _is_plausible_word(word: str) -> bool:
+    lower = word.lower()
+    if len(lower) == 1:
+        return lower in ('a', 'i')
+    has_vowel = any(c in VOWELS for c in lower)
+    mixed_case = not (word.islower() or word.isupper() or word.istitle())
+    return has_vowel and not mixed_case
+
+
+def word_scores(text: str):
+    words = WORD_RE.findall(text)
+    if not words:
+        return 0.0, 0.0
+    dictionary_hits = sum(1 for word in words if word.lower() in COMMON_WORDS)
+    plausible = sum(1 for word in words if _is_plausible_word(word))
+    return dictionary_hits / len(words), plausible / len(words)
+
+
+def line_structure_score(text: str) -> float:
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    if not lines:
+        return 0.0
+    repeated = 1 - len(set(lines)) / len(lines)
+    if repeated > MAX_REPEATED_LINE_RATIO:
+        return 0.0
+    fragments = sum(1 for line in lines if len(line) <= 2) / len(lines)
+    return max(0.0, 1.0 - fragments - repeated)
+
+
+def text_quality(text: str) -> float:
+    if len(''.join(text.split())) < MIN_VISIBLE_CHARS:
+        return 0.0
+
+    garbage = garbage_ratio(text)
+    if garbage > MAX_GARBAGE_RATIO:
+        return 0.0
+
+    dictionary_rate, plausible_rate = word_scores(text)
+    dictionary = min(1.0, dictionary_rate / DICTIONARY_TARGET_RATE)
+    clean = 1.0 - garbage / MAX_GARBAGE_RATIO
+
+    return (
+        0.4 * plausible_rate
+        + 0.25 * dictionary
+        + 0.15 * clean
+        + 0.2 * line_structure_score(text)
+    )
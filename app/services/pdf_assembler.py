@@ -0,0 +1,164 @@
+import io
+import os
+import re
+import zipfile
+from typing import Optional, Callable, List, Tuple
+
+from .pdf_text import open_pdf
+from ..utils.exceptions import ConversionError
+
+
+PAGE_RANGE_RE = re.compile(r'^\s*(\d+)\s*(?:-\s*(\d+)\s*)?$')
+
+
+def parse_page_ranges(spec: str, page_count: int) -> List[Tuple[int, int]]:
+    ranges = []
+    for part in spec.split(','):
+        if not part.strip():
+            continue
+        match = PAGE_RANGE_RE.match(part)
+        if not match:
+            raise ConversionError(f"Invalid page range: {part.strip()}")
+        start = int(match.group(1))
+        end = int(match.group(2) or start)
+        if start < 1 or end > page_count or start > end:
+            raise ConversionError(f"Page range {start}-{end} is outside 1-{page_count}")
+        ranges.append((start - 1, end - 1))
+    if not ranges:
+        raise ConversionError("No page ranges given")
+    return ranges
+
+
+class PDFAssembler:
+    IMAGE_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff', 'tif', 'webp', 'ico', 'heic', 'heif'}
+    SAVE_OPTIONS = {'garbage': 3, 'deflate': True}
+
+    def __init__(self, progress_callback: Optional[Callable[[int], None]] = None):
+        self.progress_callback = progress_callback
+        self.is_cancelled = False
+
+    def report_progress(self, progress: int):
+        if self.progress_callback:
+            self.progress_callback(min(100, max(0, progress)))
+
+    def cancel(self):
+        self.is_cancelled = True
+
+    def _append_pdf(self, target, input_path: str, password: Optional[str]) -> None:
+        source = open_pdf(input_path, password)
+        try:
+            target.insert_pdf(source)
+        finally:
+            source.close()
+
+    def append_image(self, target, input_path: str) -> None:
+        import fitz
+
+        try:
+            with fitz.open(input_path) as image_doc:
+                rect = image_doc[0].rect
+            page = target.new_page(width=rect.width, height=rect.height)
+            page.insert_image(page.rect, filename=input_path)
+        except Exception:
+            stream, width, height = self._image_to_jpeg(input_path)
+            page = target.new_page(width=width, height=height)
+            page.insert_image(page.rect, stream=stream)
+
+    def _image_to_jpeg(self, input_path: str) -> Tuple[bytes, int, int]:
+        from PIL import Image
+
+        try:
+            from pillow_heif import register_heif_opener
+            register_heif_opener()
+        except ImportError:
+            pass
+
+        with Image.open(input_path) as image:
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            buffer = io.BytesIO()
+            image.save(buffer, 'JPEG', quality=95)
+            return buffer.getvalue(), image.width, image.height
+
+    def assemble(
+        self,
+        input_paths: List[str],
+        output_path: str,
+        password: Optional[str] = None
+    ) -> Optional[str]:
+        import fitz
+
+        if not input_paths:
+            raise ConversionError("No files to merge")
+
+        target = fitz.open()
+        try:
+            for done, input_path in enumerate(input_paths, start=1):
+                if self.is_cancelled:
+                    return None
+
+                ext = os.path.splitext(input_path)[1].lstrip('.').lower()
+                if ext == 'pdf':
+                    self._append_pdf(target, input_path, password)
+                elif ext in self.IMAGE_EXTENSIONS:
+                    self.append_image(target, input_path)
+                else:
+                    raise ConversionError(f"Cannot merge .{ext} files into a PDF")
+
+                target = self._save_appended(target, output_path, first=done == 1)
+                self.report_progress(int(done / len(input_paths) * 90))
+        finally:
+            target.close()
+
+        self.report_progress(100)
+        return output_path
+
+    def _save_appended(self, target, output_path: str, first: bool):
+        import fitz
+
+        if first:
+            target.save(output_path, **self.SAVE_OPTIONS)
+        else:
+            target.save(output_path, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP, deflate=True)
+        target.close()
+        return fitz.open(output_path)
+
+    def split(
+        self,
+        input_path: str,
+        output_path: str,
+        ranges: Optional[str] = None,
+        pages_per_file: Optional[int] = None,
+        password: Optional[str] = None
+    ) -> Optional[str]:
+        import fitz
+
+        source = open_pdf(input_path, password)
+        try:
+            page_count = len(source)
+            if ranges:
+                parts = parse_page_ranges(ranges, page_count)
+            else:
+                size = max(1, int(pages_per_file or 1))
+                parts = [(start, min(start + size, page_count) - 1) for start in range(0, page_count, size)]
+
+            base_name = os.path.splitext(os.path.basename(output_path))[0]
+            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_STORED) as archive:
+                for done, (start, end) in enumerate(parts, start=1):
+                    if self.is_cancelled:
+                        return None
+
+                    part = fitz.open()
+                    try:
+                        part.insert_pdf(source, from_page=start, to_page=end)
+                        data = part.tobytes(**self.SAVE_OPTIONS)
+                    finally:
+                        part.close()
+
+                    archive.writestr(f"{base_name}_p{start + 1}-{end + 1}.pdf", data)
+                    self.report_progress(int(done / len(parts) * 100))
+        finally:
+            source.close()
+
+        self.report_progress(100)
+        return output_path
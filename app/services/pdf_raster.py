@@ -0,0 +1,150 @@
+import io
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional, List, Tuple, Callable
+
+from .pdf_text import open_pdf
+
+
+IMAGE_FORMATS = {'png': 'PNG', 'jpg': 'JPEG', 'jpeg': 'JPEG', 'webp': 'WEBP'}
+
+
+def zip_output_path(output_path: str) -> str:
+    return os.path.splitext(output_path)[0] + '.zip'
+
+
+class _AppendOnlyFile:
+    def __init__(self, file):
+        self._file = file
+
+    def write(self, data) -> int:
+        return self._file.write(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+
+def render_page(page, dpi: int, image_format: str, quality: int) -> bytes:
+    pix = page.get_pixmap(dpi=dpi, alpha=False)
+    if image_format == 'png':
+        return pix.tobytes('png')
+
+    from PIL import Image
+
+    image = Image.frombytes('RGB', (pix.width, pix.height), pix.samples)
+    buffer = io.BytesIO()
+    image.save(buffer, IMAGE_FORMATS[image_format], quality=quality)
+    return buffer.getvalue()
+
+
+def _render_page_chunk(
+    input_path: str,
+    password: Optional[str],
+    page_indexes: List[int],
+    dpi: int,
+    image_format: str,
+    quality: int
+) -> List[Tuple[int, bytes]]:
+    doc = open_pdf(input_path, password)
+    try:
+        return [(i, render_page(doc[i], dpi, image_format, quality)) for i in page_indexes]
+    finally:
+        doc.close()
+
+
+class PDFRasterizer:
+    PARALLEL_MIN_PAGES = 4
+    PAGES_PER_TASK = 2
+
+    def __init__(
+        self,
+        input_path: str,
+        password: Optional[str] = None,
+        dpi: int = 150,
+        image_format: str = 'png',
+        quality: int = 90,
+        max_workers: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ):
+        self.input_path = input_path
+        self.password = password
+        self.dpi = dpi
+        self.image_format = image_format
+        self.quality = quality
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._progress_callback = progress_callback
+
+    def _page_name(self, index: int, page_count: int) -> str:
+        width = len(str(page_count))
+        ext = 'jpg' if self.image_format == 'jpeg' else self.image_format
+        return f"page_{index + 1:0{width}d}.{ext}"
+
+    def _report(self, done: int, total: int) -> None:
+        if self._progress_callback:
+            self._progress_callback(done, total)
+
+    def render_single(self, page_index: int, output_path: str) -> str:
+        doc = open_pdf(self.input_path, self.password)
+        try:
+            data = render_page(doc[page_index], self.dpi, self.image_format, self.quality)
+        finally:
+            doc.close()
+        with open(output_path, 'wb') as f:
+            f.write(data)
+        self._report(1, 1)
+        return output_path
+
+    def _add_page(self, archive: zipfile.ZipFile, f, index: int, page_count: int, data: bytes) -> None:
+        archive.writestr(self._page_name(index, page_count), data)
+        f.flush()
+
+    def render_to_zip(
+        self,
+        page_indexes: List[int],
+        page_count: int,
+        output_path: str,
+        is_cancelled: Callable[[], bool] = lambda: False
+    ) -> Optional[str]:
+        total = len(page_indexes)
+        done = 0
+
+        with open(output_path, 'wb') as f, zipfile.ZipFile(_AppendOnlyFile(f), 'w', zipfile.ZIP_STORED) as archive:
+            if total < self.PARALLEL_MIN_PAGES or self.max_workers < 2:
+                doc = open_pdf(self.input_path, self.password)
+                try:
+                    for i in page_indexes:
+                        if is_cancelled():
+                            return None
+                        data = render_page(doc[i], self.dpi, self.image_format, self.quality)
+                        self._add_page(archive, f, i, page_count, data)
+                        done += 1
+                        self._report(done, total)
+                finally:
+                    doc.close()
+                return output_path
+
+            chunks = [
+                page_indexes[i:i + self.PAGES_PER_TASK]
+                for i in range(0, total, self.PAGES_PER_TASK)
+            ]
+            executor = ProcessPoolExecutor(max_workers=min(self.max_workers, len(chunks)))
+            try:
+                futures = [
+                    executor.submit(
+                        _render_page_chunk, self.input_path, self.password, chunk,
+                        self.dpi, self.image_format, self.quality
+                    )
+                    for chunk in chunks
+                ]
+                for future in as_completed(futures):
+                    if is_cancelled():
+                        return None
+                    for index, data in future.result():
+                        self._add_page(archive, f, index, page_count, data)
+                        done += 1
+                        self._report(done, total)
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        return output_path
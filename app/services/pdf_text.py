@@ -0,0 +1,284 @@
+import os
+import json
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Iterator, List, Tuple, Callable, Dict, Any, Union
+
+from ..utils.exceptions import ConversionError, PasswordRequiredError, InvalidPasswordError
+
+
+def _open_pdf(input_path: Union[str, bytes], password: Optional[str] = None) -> Tuple[Any, bool]:
+    import fitz
+
+    if isinstance(input_path, (bytes, bytearray, memoryview)):
+        doc = fitz.open(stream=bytes(input_path), filetype='pdf')
+    else:
+        doc = fitz.open(input_path)
+    # needs_pass must not be read again once authenticated: doing so breaks decryption.
+    encrypted = bool(doc.needs_pass)
+    if encrypted:
+        if not password:
+            doc.close()
+            raise PasswordRequiredError()
+        if not doc.authenticate(password):
+            doc.close()
+            raise InvalidPasswordError()
+    return doc, encrypted
+
+
+def open_pdf(input_path: Union[str, bytes], password: Optional[str] = None):
+    return _open_pdf(input_path, password)[0]
+
+
+def resolve_page_range(page_count: int, start_page: Optional[int] = None, end_page: Optional[int] = None) -> Tuple[int, int]:
+    start = max(1, int(start_page or 1))
+    end = min(page_count, int(end_page or page_count))
+    if start > end:
+        raise ConversionError(f"Invalid page range {start}-{end} for a document with {page_count} pages")
+    return start - 1, end
+
+
+def parse_page(page) -> Dict[str, Any]:
+    import fitz
+
+    blocks = []
+    size_weights = Counter()
+    content = page.get_text('dict', flags=fitz.TEXTFLAGS_TEXT)
+
+    for block in content.get('blocks', []):
+        lines = []
+        max_size = 0.0
+        for line in block.get('lines', []):
+            line_text = ''.join(span['text'] for span in line.get('spans', []))
+            for span in line.get('spans', []):
+                size = round(span['size'], 1)
+                max_size = max(max_size, size)
+                size_weights[size] += len(span['text'].strip())
+            lines.append(line_text)
+        if not any(l.strip() for l in lines):
+            continue
+        blocks.append({
+            'text': '\n'.join(lines),
+            'size': max_size,
+            'bbox': [round(v, 1) for v in block['bbox']]
+        })
+
+    body_size = size_weights.most_common(1)[0][0] if size_weights else 0.0
+    return {
+        'number': page.number,
+        'width': round(page.rect.width, 1),
+        'height': round(page.rect.height, 1),
+        'body_size': body_size,
+        'blocks': blocks
+    }
+
+
+def page_text(page: Dict[str, Any]) -> str:
+    return ''.join(block['text'] + '\n' for block in page['blocks'])
+
+
+def _parse_page_range(input_path: str, password: Optional[str], start: int, end: int) -> List[Dict[str, Any]]:
+    doc = open_pdf(input_path, password)
+    try:
+        return [parse_page(doc[i]) for i in range(start, end)]
+    finally:
+        doc.close()
+
+
+class PDFTextExtractor:
+    PARALLEL_MIN_PAGES = 64
+    PAGES_PER_TASK = 16
+
+    def __init__(
+        self,
+        input_path: str,
+        password: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ):
+        self.input_path = input_path
+        self.password = password
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._progress_callback = progress_callback
+        self._doc, self.is_encrypted = _open_pdf(input_path, password)
+        self.page_count = len(self._doc)
+
+    def close(self) -> None:
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _report(self, done: int) -> None:
+        if self._progress_callback:
+            self._progress_callback(done, self.page_count)
+
+    def _page_ranges(self, first_page: int) -> List[Tuple[int, int]]:
+        return [
+            (start, min(start + self.PAGES_PER_TASK, self.page_count))
+            for start in range(first_page, self.page_count, self.PAGES_PER_TASK)
+        ]
+
+    def iter_pages(self, first_page: int = 0) -> Iterator[Dict[str, Any]]:
+        if self.page_count - first_page < self.PARALLEL_MIN_PAGES or self.max_workers < 2:
+            for i in range(first_page, self.page_count):
+                yield parse_page(self._doc[i])
+                self._report(i + 1)
+            return
+
+        ranges = self._page_ranges(first_page)
+        done = first_page
+        executor = ProcessPoolExecutor(max_workers=min(self.max_workers, len(ranges)))
+        try:
+            futures = [
+                executor.submit(_parse_page_range, self.input_path, self.password, start, end)
+                for start, end in ranges
+            ]
+            for future in futures:
+                for page in future.result():
+                    done += 1
+                    yield page
+                    self._report(done)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PDFPageCache:
+    SUFFIX = '.pages.jsonl'
+    VERSION = 2
+
+    _writers = set()
+    _writers_lock = threading.Lock()
+
+    def __init__(self, input_path: str, partial_path: Optional[str] = None):
+        self.input_path = input_path
+        self.cache_path = input_path + self.SUFFIX
+        self.partial_path = partial_path or self.cache_path + '.partial'
+
+    def _signature(self) -> Dict[str, Any]:
+        stat = os.stat(self.input_path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def read_header(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+        if header.get('version') != self.VERSION or header.get('source') != self._signature():
+            return None
+        return header
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        with open(self.cache_path, 'r', encoding='utf-8') as f:
+            f.readline()
+            for line in f:
+                yield json.loads(line)
+
+    def acquire(self) -> bool:
+        with self._writers_lock:
+            if self.cache_path in self._writers:
+                return False
+            self._writers.add(self.cache_path)
+            return True
+
+    def release(self) -> None:
+        with self._writers_lock:
+            self._writers.discard(self.cache_path)
+
+    def read_partial(self) -> Tuple[List[Dict[str, Any]], int]:
+        pages = []
+        offset = 0
+        try:
+            with open(self.partial_path, 'rb') as f:
+                header = f.readline()
+                fields = json.loads(header)
+                if fields.get('version') != self.VERSION or fields.get('source') != self._signature():
+                    return [], 0
+                offset = len(header)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    pages.append(json.loads(line))
+                    offset += len(line)
+        except (OSError, ValueError):
+            pass
+        return pages, offset
+
+    def write(
+        self,
+        pages: Iterator[Dict[str, Any]],
+        page_count: int,
+        encrypted: bool,
+        resume_offset: int = 0
+    ) -> Iterator[Dict[str, Any]]:
+        if resume_offset:
+            f = open(self.partial_path, 'r+b')
+            f.seek(resume_offset)
+            f.truncate()
+        else:
+            f = open(self.partial_path, 'wb')
+            header = {'version': self.VERSION, 'source': self._signature(), 'page_count': page_count, 'encrypted': encrypted}
+            f.write((json.dumps(header) + '\n').encode('utf-8'))
+
+        with f:
+            for page in pages:
+                f.write((json.dumps(page, ensure_ascii=False) + '\n').encode('utf-8'))
+                f.flush()
+                yield page
+        os.replace(self.partial_path, self.cache_path)
+
+
+def _resume_pages(
+    cache: PDFPageCache,
+    extractor: PDFTextExtractor,
+    progress_callback: Optional[Callable[[int, int], None]]
+) -> Iterator[Dict[str, Any]]:
+    resumed, offset = cache.read_partial()
+    for done, page in enumerate(resumed, start=1):
+        yield page
+        if progress_callback:
+            progress_callback(done, extractor.page_count)
+    yield from cache.write(
+        extractor.iter_pages(len(resumed)),
+        extractor.page_count,
+        extractor.is_encrypted,
+        offset if resumed else 0
+    )
+
+
+def iter_pdf_pages(
+    input_path: str,
+    password: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    partial_path: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    cache = PDFPageCache(input_path, partial_path)
+    header = cache.read_header()
+
+    if header is not None:
+        if header.get('encrypted'):
+            open_pdf(input_path, password).close()
+        total = header['page_count']
+        for done, page in enumerate(cache.read(), start=1):
+            yield page
+            if progress_callback:
+                progress_callback(done, total)
+        return
+
+    with PDFTextExtractor(input_path, password, max_workers, progress_callback) as extractor:
+        if not cache.acquire():
+            yield from extractor.iter_pages()
+            return
+        try:
+            yield from _resume_pages(cache, extractor, progress_callback)
+        finally:
+            cache.release()
+
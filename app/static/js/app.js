@@ -7,7 +7,9 @@ const appState = {
     selectedFormat: null,
     isConverting: false,
     pollInterval: null,
-    socket: null
+    socket: null,
+    partialPages: {},
+    livePages: {}
 };
 
 appState.socket = io();
@@ -22,6 +24,21 @@ appState.socket.on('conversion_progress', (data) => {
     }
 });
 
+appState.socket.on('conversion_tokens', (data) => {
+    if (data.job_id === appState.currentJobId) {
+        appState.livePages[data.page] = (appState.livePages[data.page] || '') + data.content;
+        renderPartialOutput();
+    }
+});
+
+appState.socket.on('conversion_partial', (data) => {
+    if (data.job_id === appState.currentJobId) {
+        appState.partialPages[data.page] = data.content;
+        delete appState.livePages[data.page];
+        renderPartialOutput();
+    }
+});
+
 appState.socket.on('conversion_complete', (data) => {
     if (data.job_id === appState.currentJobId) {
         appState.isConverting = false;
@@ -76,7 +93,11 @@ const ui = {
     ocrLimitCss: document.getElementById('ocrLimitCss'),
     ocrCssSliderContainer: document.getElementById('ocrCssSliderContainer'),
     ocrCssLength: document.getElementById('ocrCssLength'),
-    ocrCssValueDisplay: document.getElementById('ocrCssValueDisplay')
+    ocrCssValueDisplay: document.getElementById('ocrCssValueDisplay'),
+    partialOutput: document.getElementById('partialOutput'),
+    partialTitle: document.getElementById('partialTitle'),
+    partialText: document.getElementById('partialText'),
+    partialDownloadBtn: document.getElementById('partialDownloadBtn')
 };
 
 // ... existing code ...
@@ -102,7 +123,7 @@ function initEventListeners() {
             
             if (container) {
                 const cssContainer = document.getElementById('ocrCssContainer');
-                if ((val === 'qwen' || val === 'lighton_mistral') && isHtmlFormat) {
+                if ((val === 'qwen' || val === 'lighton_mistral' || val === 'auto') && isHtmlFormat) {
                     container.classList.remove('hidden');
                     if (cssContainer) cssContainer.classList.remove('hidden');
                     console.log('Showing theme container');
@@ -210,6 +231,10 @@ const api = {
     
     getDownloadUrl(jobId) {
         return `${this.baseUrl}/download/${jobId}`;
+    },
+    
+    getPartialDownloadUrl(jobId) {
+        return `${this.baseUrl}/download/${jobId}?partial=1`;
     }
 };
 
@@ -411,6 +436,7 @@ async function startConversion(format) {
     ui.conversionProgress.classList.remove('hidden');
     ui.conversionProgress.classList.add('animate-scale');
     
+    clearPartialOutput();
     updateConversionProgress(0, 'Starting conversion...');
     
     try {
@@ -433,6 +459,36 @@ function updateConversionProgress(percentage, statusText) {
     ui.conversionStatus.textContent = statusText;
 }
 
+function renderPartialOutput() {
+    if (!ui.partialOutput) return;
+    
+    const pages = new Set([...Object.keys(appState.partialPages), ...Object.keys(appState.livePages)]);
+    const ordered = [...pages].map(Number).sort((a, b) => a - b);
+    const doneCount = Object.keys(appState.partialPages).length;
+    
+    ui.partialText.textContent = ordered
+        .map(page => appState.partialPages[page] ?? appState.livePages[page])
+        .join('\n\n');
+    ui.partialText.scrollTop = ui.partialText.scrollHeight;
+    ui.partialTitle.textContent = doneCount ? `Live output · ${doneCount} page${doneCount === 1 ? '' : 's'} ready` : 'Live output';
+    ui.partialOutput.classList.remove('hidden');
+    
+    const format = (appState.selectedFormat || '').toLowerCase().replace('ocr-', '');
+    if (doneCount && ['txt', 'md', 'html'].includes(format)) {
+        ui.partialDownloadBtn.classList.remove('hidden');
+        ui.partialDownloadBtn.onclick = () => { window.location.href = api.getPartialDownloadUrl(appState.currentJobId); };
+    }
+}
+
+function clearPartialOutput() {
+    appState.partialPages = {};
+    appState.livePages = {};
+    if (!ui.partialOutput) return;
+    ui.partialOutput.classList.add('hidden');
+    ui.partialDownloadBtn.classList.add('hidden');
+    ui.partialText.textContent = '';
+}
+
 function getStatusMessage(progress) {
     if (progress < 15) return 'Preparing file...';
     if (progress < 40) return 'Processing...';
@@ -512,6 +568,7 @@ function resetApp() {
     if (ui.aiOptions) ui.aiOptions.classList.add('hidden');
     if (ui.useLLM) ui.useLLM.checked = false;
     ui.errorMessage.classList.add('hidden');
+    clearPartialOutput();
     ui.fileInput.value = '';
     ui.progressFill.style.width = '0%';
     ui.conversionFill.style.width = '0%';
@@ -48,6 +48,21 @@ class OCRError(ConversionError):
         super().__init__(message, 500)
 
 
+class LLMUnavailableError(ConversionError):
+    def __init__(self, detail: str = None):
+        message = "LLM server unavailable"
+        if detail:
+            message += f": {detail}"
+        super().__init__(message, 503)
+
+
+class GenerationLimitError(ConversionError):
+    def __init__(self, partial_text: str, detail: str):
+        message = f"Generation aborted: {detail}"
+        super().__init__(message, 500)
+        self.partial_text = partial_text
+
+
 class ConversionJobNotFoundError(ConversionError):
     def __init__(self, job_id: str):
         message = f"Conversion job not found: {job_id}"
@@ -1,4 +1,5 @@
 import os
+import shutil
 import uuid
 import time
 from pathlib import Path
@@ -87,6 +88,14 @@ def cleanup_old_files(folder: Path, max_age_hours: int = 1) -> int:
     return deleted
 
 
+def link_or_copy_file(source_path: str, target_path: str) -> str:
+    try:
+        os.link(source_path, target_path)
+    except OSError:
+        shutil.copy2(source_path, target_path)
+    return target_path
+
+
 def get_file_size_mb(file_path: str) -> float:
     return os.path.getsize(file_path) / (1024 * 1024)
 
@@ -0,0 +1,94 @@
+import argparse
+import time
+
+from app.services.lighton_server import LightOnServer
+from app.services.ocr_pages import render_page_image, token_budget
+from app.services.pdf_text import open_pdf
+
+
+def edit_distance(first: str, second: str) -> int:
+    previous = list(range(len(second) + 1))
+    for i, a in enumerate(first, start=1):
+        current = [i]
+        for j, b in enumerate(second, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a != b)))
+        previous = current
+    return previous[-1]
+
+
+def character_error_rate(reference: str, hypothesis: str) -> float:
+    reference = ' '.join(reference.split())
+    hypothesis = ' '.join(hypothesis.split())
+    if not reference:
+        return 0.0 if not hypothesis else 1.0
+    return edit_distance(reference, hypothesis) / len(reference)
+
+
+def load_pages(input_path: str, page_limit: int):
+    doc = open_pdf(input_path, None)
+    try:
+        pages = []
+        for page in doc:
+            if len(pages) >= page_limit:
+                break
+            page_image = render_page_image(page, 'lighton', {'ocr_skip_blank': False})
+            pages.append((page_image['data'], token_budget(page_image['ink_coverage'])))
+        return pages
+    finally:
+        doc.close()
+
+
+def run_profile(name: str, pages, args) -> list:
+    server = LightOnServer(
+        max_batch_size=args.batch_size,
+        device='cpu',
+        quantize=name == 'int8',
+        num_threads=args.threads,
+        interop_threads=args.interop_threads
+    )
+    try:
+        server.load()
+        server.recognize(pages[0][0], 16)
+
+        start = time.perf_counter()
+        futures = [server.submit(data, tokens) for data, tokens in pages]
+        texts = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+    finally:
+        server.unload()
+
+    print(f"{name:8s} {len(pages) / elapsed:6.3f} pages/s  ({elapsed:.1f}s for {len(pages)} pages)")
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare LightOn OCR CPU profiles (float32 vs dynamic int8).')
+    parser.add_argument('pdf')
+    parser.add_argument('--pages', type=int, default=8)
+    parser.add_argument('--batch-size', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--interop-threads', type=int, default=1)
+    parser.add_argument('--truth', help='Reference text, one page per form feed (\\f)')
+    args = parser.parse_args()
+
+    pages = load_pages(args.pdf, args.pages)
+    if not pages:
+        parser.error('The PDF has no pages')
+
+    baseline = run_profile('float32', pages, args)
+    quantized = run_profile('int8', pages, args)
+
+    cer = sum(character_error_rate(b, q) for b, q in zip(baseline, quantized)) / len(pages)
+    print(f"int8 vs float32 CER: {cer:.4f}")
+
+    if args.truth:
+        with open(args.truth, 'r', encoding='utf-8') as f:
+            truth = f.read().split('\f')
+        for name, texts in (('float32', baseline), ('int8', quantized)):
+            pairs = list(zip(truth, texts))
+            cer = sum(character_error_rate(t, h) for t, h in pairs) / len(pairs)
+            print(f"{name:8s} CER vs truth: {cer:.4f}")
+
+
+if __name__ == '__main__':
+    main()
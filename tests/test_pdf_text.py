@@ -0,0 +1,52 @@
+import fitz
+import pytest
+
+from app.services.pdf_text import PDFPageCache, iter_pdf_pages, page_text
+from app.utils.exceptions import InvalidPasswordError, PasswordRequiredError
+
+
+PAGES = ["Secret page one", "Secret page two", "Secret page three"]
+
+
+@pytest.fixture(params=[fitz.PDF_ENCRYPT_RC4_128, fitz.PDF_ENCRYPT_AES_128, fitz.PDF_ENCRYPT_AES_256])
+def encrypted_pdf(tmp_path, request):
+    path = tmp_path / 'encrypted.pdf'
+    doc = fitz.open()
+    for text in PAGES:
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(str(path), encryption=request.param, user_pw='user', owner_pw='owner')
+    doc.close()
+    return str(path)
+
+
+def extract(path, password):
+    return [page_text(page).strip() for page in iter_pdf_pages(path, password, max_workers=1)]
+
+
+def test_encrypted_pdf_text_is_extracted(encrypted_pdf):
+    assert extract(encrypted_pdf, 'user') == PAGES
+
+
+def test_encrypted_pdf_text_is_served_from_the_sidecar(encrypted_pdf):
+    extract(encrypted_pdf, 'user')
+    assert PDFPageCache(encrypted_pdf).read_header() is not None
+    assert extract(encrypted_pdf, 'user') == PAGES
+
+
+def test_encrypted_sidecar_still_checks_the_password(encrypted_pdf):
+    extract(encrypted_pdf, 'user')
+    with pytest.raises(PasswordRequiredError):
+        extract(encrypted_pdf, None)
+    with pytest.raises(InvalidPasswordError):
+        extract(encrypted_pdf, 'wrong')
+
+
+def test_sidecar_from_an_older_version_is_ignored(encrypted_pdf):
+    extract(encrypted_pdf, 'user')
+    cache = PDFPageCache(encrypted_pdf)
+    with open(cache.cache_path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    lines[0] = lines[0].replace('"version": %d, ' % PDFPageCache.VERSION, '')
+    with open(cache.cache_path, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+    assert cache.read_header() is None